@@ -0,0 +1,43 @@
+"""Add maintained participant counter to activities
+
+Revision ID: 005_activity_participant_count
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = '005_activity_participant_count'
+down_revision = '004_audit_logging'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Add counter column
+    op.add_column(
+        'activities',
+        sa.Column('participant_count', sa.Integer(), nullable=False, server_default='0')
+    )
+
+    # Backfill from existing participants
+    connection = op.get_bind()
+    connection.execute(
+        sa.text(
+            'UPDATE activities SET participant_count = ('
+            'SELECT COUNT(*) FROM activity_participants '
+            'WHERE activity_participants.activity_id = activities.id)'
+        )
+    )
+
+    # Guard against overbooking at the database level; batch mode lets
+    # SQLite add the constraint by recreating the table
+    with op.batch_alter_table('activities') as batch_op:
+        batch_op.create_check_constraint(
+            'ck_activities_participant_count',
+            'participant_count <= max_participants'
+        )
+
+def downgrade():
+    with op.batch_alter_table('activities') as batch_op:
+        batch_op.drop_constraint('ck_activities_participant_count', type_='check')
+        batch_op.drop_column('participant_count')
@@ -0,0 +1,31 @@
+"""Add activity waitlist
+
+Revision ID: 006_activity_waitlist
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = '006_activity_waitlist'
+down_revision = '005_activity_participant_count'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Create activity_waitlist table
+    op.create_table(
+        'activity_waitlist',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('activity_id', sa.Integer(), sa.ForeignKey('activities.id'), nullable=False),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.UniqueConstraint('activity_id', 'user_id', name='uq_activity_waitlist_activity_user')
+    )
+
+    # Queue order within an activity
+    op.create_index('ix_activity_waitlist_activity_id_id', 'activity_waitlist', ['activity_id', 'id'])
+
+def downgrade():
+    op.drop_index('ix_activity_waitlist_activity_id_id')
+    op.drop_table('activity_waitlist')
@@ -0,0 +1,120 @@
+"""Partition audit logs by month
+
+Revision ID: 007_partition_audit_logs
+Create Date: 2026-10-17
+"""
+from datetime import datetime
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = '007_partition_audit_logs'
+down_revision = '006_activity_waitlist'
+branch_labels = None
+depends_on = None
+
+# Months of partitions created ahead of the current month
+MONTHS_AHEAD = 3
+
+INDEXES = {
+    'ix_audit_logs_timestamp': 'timestamp',
+    'ix_audit_logs_actor_id': 'actor_id',
+    'ix_audit_logs_action': 'action',
+    'ix_audit_logs_entity_type': 'entity_type'
+}
+
+def _next_month(month):
+    return datetime(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+def upgrade():
+    connection = op.get_bind()
+    if connection.dialect.name != 'postgresql':
+        # Declarative partitioning is PostgreSQL only
+        return
+
+    # Keep the id sequence when the old table goes away
+    op.execute('ALTER SEQUENCE audit_logs_id_seq OWNED BY NONE')
+    op.execute('ALTER TABLE audit_logs RENAME TO audit_logs_legacy')
+    for index in INDEXES:
+        op.execute(f'DROP INDEX IF EXISTS {index}')
+
+    # Create partitioned audit_logs table; the partition key must be in the primary key
+    op.execute(
+        """
+        CREATE TABLE audit_logs (
+            id INTEGER NOT NULL DEFAULT nextval('audit_logs_id_seq'),
+            timestamp TIMESTAMP NOT NULL,
+            actor_id INTEGER REFERENCES users (id),
+            action VARCHAR(100) NOT NULL,
+            entity_type VARCHAR(50) NOT NULL,
+            entity_id INTEGER,
+            details VARCHAR(1000),
+            ip_address VARCHAR(45),
+            PRIMARY KEY (id, timestamp)
+        ) PARTITION BY RANGE (timestamp)
+        """
+    )
+    op.execute('ALTER SEQUENCE audit_logs_id_seq OWNED BY audit_logs.id')
+    op.execute('CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT')
+
+    # Monthly partitions from the oldest event until a few months ahead
+    oldest = connection.execute(
+        sa.text('SELECT MIN(timestamp) FROM audit_logs_legacy')
+    ).scalar() or datetime.utcnow()
+    month = datetime(oldest.year, oldest.month, 1)
+    last = datetime.utcnow()
+    for _ in range(MONTHS_AHEAD):
+        last = _next_month(last.replace(day=1))
+    while month <= last:
+        following = _next_month(month)
+        op.execute(
+            f"CREATE TABLE audit_logs_p{month:%Y_%m} PARTITION OF audit_logs "
+            f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{following:%Y-%m-%d}')"
+        )
+        month = following
+
+    # Indexes on the parent are created on every partition
+    for index, column in INDEXES.items():
+        op.create_index(index, 'audit_logs', [column])
+
+    # Move existing events
+    op.execute(
+        'INSERT INTO audit_logs (id, timestamp, actor_id, action, entity_type, entity_id, details, ip_address) '
+        'SELECT id, timestamp, actor_id, action, entity_type, entity_id, details, ip_address '
+        'FROM audit_logs_legacy'
+    )
+    op.execute('DROP TABLE audit_logs_legacy')
+
+def downgrade():
+    connection = op.get_bind()
+    if connection.dialect.name != 'postgresql':
+        return
+
+    op.execute('ALTER SEQUENCE audit_logs_id_seq OWNED BY NONE')
+    op.execute('ALTER TABLE audit_logs RENAME TO audit_logs_partitioned')
+    for index in INDEXES:
+        op.execute(f'DROP INDEX IF EXISTS {index}')
+
+    op.create_table(
+        'audit_logs',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=False,
+                  server_default=sa.text("nextval('audit_logs_id_seq')")),
+        sa.Column('timestamp', sa.DateTime(), nullable=False),
+        sa.Column('actor_id', sa.Integer(), sa.ForeignKey('users.id')),
+        sa.Column('action', sa.String(100), nullable=False),
+        sa.Column('entity_type', sa.String(50), nullable=False),
+        sa.Column('entity_id', sa.Integer()),
+        sa.Column('details', sa.String(1000)),
+        sa.Column('ip_address', sa.String(45))
+    )
+    op.execute('ALTER SEQUENCE audit_logs_id_seq OWNED BY audit_logs.id')
+    for index, column in INDEXES.items():
+        op.create_index(index, 'audit_logs', [column])
+
+    op.execute(
+        'INSERT INTO audit_logs (id, timestamp, actor_id, action, entity_type, entity_id, details, ip_address) '
+        'SELECT id, timestamp, actor_id, action, entity_type, entity_id, details, ip_address '
+        'FROM audit_logs_partitioned'
+    )
+    # Dropping the parent drops every partition
+    op.execute('DROP TABLE audit_logs_partitioned')
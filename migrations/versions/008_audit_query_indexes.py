@@ -0,0 +1,39 @@
+"""Composite indexes for audit log queries
+
+Revision ID: 008_audit_query_indexes
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic
+revision = '008_audit_query_indexes'
+down_revision = '007_partition_audit_logs'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Replace single-column indexes with keyset-friendly composites
+    op.drop_index('ix_audit_logs_entity_type', table_name='audit_logs')
+    op.drop_index('ix_audit_logs_action', table_name='audit_logs')
+    op.drop_index('ix_audit_logs_actor_id', table_name='audit_logs')
+    op.drop_index('ix_audit_logs_timestamp', table_name='audit_logs')
+
+    op.create_index('ix_audit_logs_timestamp_id', 'audit_logs', ['timestamp', 'id'])
+    op.create_index('ix_audit_logs_actor_id_timestamp', 'audit_logs', ['actor_id', 'timestamp', 'id'])
+    op.create_index('ix_audit_logs_action_timestamp', 'audit_logs', ['action', 'timestamp', 'id'])
+    op.create_index(
+        'ix_audit_logs_entity_timestamp',
+        'audit_logs',
+        ['entity_type', 'entity_id', 'timestamp', 'id']
+    )
+
+def downgrade():
+    op.drop_index('ix_audit_logs_entity_timestamp', table_name='audit_logs')
+    op.drop_index('ix_audit_logs_action_timestamp', table_name='audit_logs')
+    op.drop_index('ix_audit_logs_actor_id_timestamp', table_name='audit_logs')
+    op.drop_index('ix_audit_logs_timestamp_id', table_name='audit_logs')
+
+    op.create_index('ix_audit_logs_timestamp', 'audit_logs', ['timestamp'])
+    op.create_index('ix_audit_logs_actor_id', 'audit_logs', ['actor_id'])
+    op.create_index('ix_audit_logs_action', 'audit_logs', ['action'])
+    op.create_index('ix_audit_logs_entity_type', 'audit_logs', ['entity_type'])
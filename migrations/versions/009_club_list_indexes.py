@@ -0,0 +1,20 @@
+"""Indexes for paginated club listing
+
+Revision ID: 009_club_list_indexes
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic
+revision = '009_club_list_indexes'
+down_revision = '008_audit_query_indexes'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index('ix_clubs_is_active_id', 'clubs', ['is_active', 'id'])
+    op.create_index('ix_clubs_category_is_active_id', 'clubs', ['category', 'is_active', 'id'])
+
+def downgrade():
+    op.drop_index('ix_clubs_category_is_active_id', table_name='clubs')
+    op.drop_index('ix_clubs_is_active_id', table_name='clubs')
@@ -0,0 +1,57 @@
+"""Add maintained membership counters to clubs and club roles
+
+Revision ID: 010_club_member_counters
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = '010_club_member_counters'
+down_revision = '009_club_list_indexes'
+branch_labels = None
+depends_on = None
+
+STATUS_COLUMNS = {
+    'active': 'active_member_count',
+    'pending': 'pending_member_count',
+    'inactive': 'inactive_member_count'
+}
+
+def upgrade():
+    # Add counter columns
+    for column in STATUS_COLUMNS.values():
+        op.add_column(
+            'clubs',
+            sa.Column(column, sa.Integer(), nullable=False, server_default='0')
+        )
+    op.add_column(
+        'club_roles',
+        sa.Column('member_count', sa.Integer(), nullable=False, server_default='0')
+    )
+
+    # Backfill from existing memberships
+    connection = op.get_bind()
+    for status, column in STATUS_COLUMNS.items():
+        connection.execute(
+            sa.text(
+                f'UPDATE clubs SET {column} = ('
+                'SELECT COUNT(*) FROM club_members '
+                'WHERE club_members.club_id = clubs.id '
+                'AND club_members.status = :status)'
+            ),
+            {"status": status}
+        )
+    connection.execute(
+        sa.text(
+            'UPDATE club_roles SET member_count = ('
+            'SELECT COUNT(*) FROM club_members '
+            'WHERE club_members.role_id = club_roles.id '
+            "AND club_members.status = 'active')"
+        )
+    )
+
+def downgrade():
+    op.drop_column('club_roles', 'member_count')
+    for column in reversed(list(STATUS_COLUMNS.values())):
+        op.drop_column('clubs', column)
@@ -0,0 +1,35 @@
+"""Make club membership unique per club and user
+
+Revision ID: 011_club_member_unique
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = '011_club_member_unique'
+down_revision = '010_club_member_counters'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Remove duplicate memberships, keeping the oldest row.
+    # Run `python -m src.database.counters --repair` afterwards if any were removed.
+    connection = op.get_bind()
+    connection.execute(
+        sa.text(
+            'DELETE FROM club_members WHERE id NOT IN ('
+            'SELECT MIN(id) FROM club_members GROUP BY club_id, user_id)'
+        )
+    )
+
+    # The unique index also serves lookups by club_id; batch mode lets
+    # SQLite add the constraint by recreating the table
+    with op.batch_alter_table('club_members') as batch_op:
+        batch_op.create_unique_constraint('uq_club_members_club_user', ['club_id', 'user_id'])
+    op.drop_index('ix_club_members_club_id', table_name='club_members')
+
+def downgrade():
+    op.create_index('ix_club_members_club_id', 'club_members', ['club_id'])
+    with op.batch_alter_table('club_members') as batch_op:
+        batch_op.drop_constraint('uq_club_members_club_user', type_='unique')
@@ -0,0 +1,52 @@
+"""Add maintained monthly club budget summaries
+
+Revision ID: 012_club_budget_summaries
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = '012_club_budget_summaries'
+down_revision = '011_club_member_unique'
+branch_labels = None
+depends_on = None
+
+# First day of the entry's month, per dialect
+MONTH_EXPRESSIONS = {
+    'postgresql': "CAST(date_trunc('month', date) AS DATE)",
+    'sqlite': "date(date, 'start of month')"
+}
+
+def upgrade():
+    # Create club_budget_summaries table
+    op.create_table(
+        'club_budget_summaries',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('club_id', sa.Integer(), sa.ForeignKey('clubs.id'), nullable=False),
+        sa.Column('month', sa.Date(), nullable=False),
+        sa.Column('type', sa.String(50), nullable=False),
+        sa.Column('category', sa.String(100), nullable=False),
+        sa.Column('total', sa.Float(), nullable=False),
+        sa.Column('entry_count', sa.Integer(), nullable=False),
+        sa.UniqueConstraint(
+            'club_id', 'month', 'type', 'category',
+            name='uq_club_budget_summaries_club_month_type_category'
+        )
+    )
+
+    # Backfill from existing entries
+    connection = op.get_bind()
+    month = MONTH_EXPRESSIONS[connection.dialect.name]
+    connection.execute(
+        sa.text(
+            'INSERT INTO club_budget_summaries '
+            '(club_id, month, type, category, total, entry_count) '
+            f'SELECT club_id, {month}, type, category, SUM(amount), COUNT(*) '
+            'FROM club_budgets '
+            f'GROUP BY club_id, {month}, type, category'
+        )
+    )
+
+def downgrade():
+    op.drop_table('club_budget_summaries')
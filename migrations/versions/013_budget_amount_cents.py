@@ -0,0 +1,56 @@
+"""Store club budget amounts as integer cents
+
+Revision ID: 013_budget_amount_cents
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = '013_budget_amount_cents'
+down_revision = '012_club_budget_summaries'
+branch_labels = None
+depends_on = None
+
+# First day of the entry's month, per dialect
+MONTH_EXPRESSIONS = {
+    'postgresql': "CAST(date_trunc('month', date) AS DATE)",
+    'sqlite': "date(date, 'start of month')"
+}
+
+def upgrade():
+    # Convert entry amounts, rounding away float error
+    op.add_column('club_budgets', sa.Column('amount_cents', sa.BigInteger(), nullable=True))
+    op.execute('UPDATE club_budgets SET amount_cents = CAST(ROUND(amount * 100) AS BIGINT)')
+    with op.batch_alter_table('club_budgets') as batch_op:
+        batch_op.alter_column('amount_cents', nullable=False)
+        batch_op.drop_column('amount')
+    op.create_index('ix_club_budgets_club_id_date', 'club_budgets', ['club_id', 'date'])
+
+    # Rebuild summaries from the exact amounts
+    op.execute('DELETE FROM club_budget_summaries')
+    with op.batch_alter_table('club_budget_summaries') as batch_op:
+        batch_op.drop_column('total')
+        batch_op.add_column(sa.Column('total_cents', sa.BigInteger(), nullable=False))
+    month = MONTH_EXPRESSIONS[op.get_bind().dialect.name]
+    op.execute(
+        'INSERT INTO club_budget_summaries '
+        '(club_id, month, type, category, total_cents, entry_count) '
+        f'SELECT club_id, {month}, type, category, SUM(amount_cents), COUNT(*) '
+        'FROM club_budgets '
+        f'GROUP BY club_id, {month}, type, category'
+    )
+
+def downgrade():
+    op.add_column('club_budget_summaries', sa.Column('total', sa.Float(), nullable=True))
+    op.execute('UPDATE club_budget_summaries SET total = total_cents / 100.0')
+    with op.batch_alter_table('club_budget_summaries') as batch_op:
+        batch_op.alter_column('total', nullable=False)
+        batch_op.drop_column('total_cents')
+
+    op.drop_index('ix_club_budgets_club_id_date', table_name='club_budgets')
+    op.add_column('club_budgets', sa.Column('amount', sa.Float(), nullable=True))
+    op.execute('UPDATE club_budgets SET amount = amount_cents / 100.0')
+    with op.batch_alter_table('club_budgets') as batch_op:
+        batch_op.alter_column('amount', nullable=False)
+        batch_op.drop_column('amount_cents')
@@ -0,0 +1,99 @@
+"""Add structured activity time slots
+
+Revision ID: 014_activity_time_slots
+Create Date: 2026-10-17
+"""
+import logging
+import re
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = '014_activity_time_slots'
+down_revision = '013_budget_amount_cents'
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger('alembic.runtime.migration')
+
+# A frozen copy of the schedule parser, so this migration keeps running the
+# same way if src/database/schedule.py changes later
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+_TIME = r'\d{1,2}(?::\d{2})?\s*[AP]M'
+_SEGMENT = re.compile(
+    rf'^(?P<days>.+?),?\s+(?P<start>{_TIME})\s*[-–]\s*(?P<end>{_TIME})$',
+    re.IGNORECASE
+)
+_DAY_SEPARATOR = re.compile(r'\s*,\s*(?:and\s+)?|\s+and\s+|\s*&\s*', re.IGNORECASE)
+
+def _parse_weekday(token):
+    name = token.strip().lower().rstrip('.')
+    if name.endswith('s') and name[:-1] in WEEKDAYS:
+        name = name[:-1]
+    for index, weekday in enumerate(WEEKDAYS):
+        if len(name) >= 3 and weekday.startswith(name):
+            return index
+    raise ValueError(f'Unknown weekday {token!r}')
+
+def _parse_time(value):
+    match = re.match(r'^(\d{1,2})(?::(\d{2}))?\s*([AP]M)$', value.strip(), re.IGNORECASE)
+    hour, minute = int(match.group(1)), int(match.group(2) or 0)
+    if not 1 <= hour <= 12 or minute > 59:
+        raise ValueError(f'Invalid time {value!r}')
+    return (hour % 12 + (12 if match.group(3).upper() == 'PM' else 0)) * 60 + minute
+
+def parse_schedule(schedule):
+    """Parse a schedule into (weekday, start_minute, end_minute) slot dicts."""
+    slots = []
+    for segment in schedule.split(';'):
+        match = _SEGMENT.match(segment.strip())
+        if not match:
+            raise ValueError(f'Unrecognized schedule {segment.strip()!r}')
+        start = _parse_time(match.group('start'))
+        end = _parse_time(match.group('end'))
+        if end <= start:
+            raise ValueError(f'Schedule ends before it starts: {segment.strip()!r}')
+        for token in _DAY_SEPARATOR.split(match.group('days')):
+            if token:
+                slot = {'weekday': _parse_weekday(token), 'start_minute': start, 'end_minute': end}
+                if slot not in slots:
+                    slots.append(slot)
+    return slots
+
+def upgrade():
+    # Create activity_time_slots table
+    time_slots = op.create_table(
+        'activity_time_slots',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('activity_id', sa.Integer(), sa.ForeignKey('activities.id'), nullable=False),
+        sa.Column('weekday', sa.Integer(), nullable=False),
+        sa.Column('start_minute', sa.Integer(), nullable=False),
+        sa.Column('end_minute', sa.Integer(), nullable=False)
+    )
+    op.create_index(
+        'ix_activity_time_slots_activity_id_weekday_start',
+        'activity_time_slots',
+        ['activity_id', 'weekday', 'start_minute']
+    )
+    op.create_index('ix_activity_participants_user_id', 'activity_participants', ['user_id'])
+
+    # Backfill from the free-text schedules
+    connection = op.get_bind()
+    rows = []
+    for activity_id, name, schedule in connection.execute(
+        sa.text('SELECT id, name, schedule FROM activities')
+    ):
+        try:
+            slots = parse_schedule(schedule)
+        except ValueError as e:
+            logger.warning('Skipping schedule of %s: %s', name, e)
+            continue
+        rows.extend({'activity_id': activity_id, **slot} for slot in slots)
+    if rows:
+        op.bulk_insert(time_slots, rows)
+
+def downgrade():
+    op.drop_index('ix_activity_participants_user_id', table_name='activity_participants')
+    op.drop_index('ix_activity_time_slots_activity_id_weekday_start', table_name='activity_time_slots')
+    op.drop_table('activity_time_slots')
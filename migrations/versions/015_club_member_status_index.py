@@ -0,0 +1,23 @@
+"""Index club memberships by club, user and status
+
+Revision ID: 015_club_member_status_index
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic
+revision = '015_club_member_status_index'
+down_revision = '014_activity_time_slots'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Serves active-membership checks at signup and in permission lookups
+    op.create_index(
+        'ix_club_members_club_id_user_id_status',
+        'club_members',
+        ['club_id', 'user_id', 'status']
+    )
+
+def downgrade():
+    op.drop_index('ix_club_members_club_id_user_id_status', table_name='club_members')
@@ -5,26 +5,90 @@ A FastAPI application that allows students to view and sign up
 for extracurricular activities at Mergington High School.
 """
 
+from contextlib import asynccontextmanager
+from datetime import datetime
 from typing import Optional, List
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Request, Response
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from pydantic import BaseModel, EmailStr, Field
+import json
 import os
 from pathlib import Path
 
-from .database.config import get_db
+from .database.config import (
+    AsyncSessionLocal,
+    get_db,
+    get_read_db,
+    pool_metrics,
+    read_router,
+    remember_write,
+    reads_from_primary
+)
 from .database.models import Activity, User
-from .auth.security import get_current_user
-from .routes import auth, clubs
+from .database.schedule import SCHEDULE_CONFLICT_MODE, schedule_conflicts
+from .database.roster_import import shutdown_hash_pool
+from .database.activities import (
+    catalog_cache,
+    is_participant,
+    add_participant,
+    remove_participant,
+    claim_seat,
+    release_seat,
+    seat_counts,
+    join_waitlist,
+    leave_waitlist,
+    promote_from_waitlist,
+    waitlist_position,
+    waitlist_length,
+    bulk_signup,
+    bulk_unregister,
+    summarize_bulk_results
+)
+from .auth.security import (
+    get_current_user,
+    check_permission,
+    principal_cache,
+    password_pool
+)
+from .auth.permissions import ClubPermission, has_club_permission, permission_cache
+from .auth.audit import audit_writer
+from .events import SSE_HEARTBEAT_INTERVAL, seat_events
+from .responses import FastJSONResponse
+from .routes import auth, clubs, audit, admin
+
+# Response compression; bodies smaller than GZIP_MINIMUM_SIZE bytes are sent as is
+GZIP_ENABLED = os.getenv("GZIP_ENABLED", "true").lower() == "true"
+GZIP_MINIMUM_SIZE = int(os.getenv("GZIP_MINIMUM_SIZE", "1000"))
+GZIP_COMPRESS_LEVEL = int(os.getenv("GZIP_COMPRESS_LEVEL", "6"))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run background workers for the lifetime of the application."""
+    audit_writer.start()
+    yield
+    await audit_writer.stop()
+    await shutdown_hash_pool()
 
 app = FastAPI(
     title="Mergington High School API",
-    description="API for viewing and signing up for extracurricular activities"
+    description="API for viewing and signing up for extracurricular activities",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
+# Compress responses larger than the threshold (event streams are never compressed)
+if GZIP_ENABLED:
+    app.add_middleware(
+        GZipMiddleware,
+        minimum_size=GZIP_MINIMUM_SIZE,
+        compresslevel=GZIP_COMPRESS_LEVEL
+    )
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -37,6 +101,8 @@ app.add_middleware(
 # Include routers
 app.include_router(auth.router)
 app.include_router(clubs.router)
+app.include_router(audit.router)
+app.include_router(admin.router)
 
 # Mount the static files directory
 current_dir = Path(__file__).parent
@@ -46,6 +112,16 @@ app.mount(
     name="static"
 )
 
+# Maximum number of items accepted by the bulk enrollment endpoints
+MAX_BULK_ITEMS = 1000
+
+class EnrollmentItem(BaseModel):
+    activity: str
+    email: EmailStr
+
+class BulkEnrollment(BaseModel):
+    items: List[EnrollmentItem] = Field(..., min_length=1, max_length=MAX_BULK_ITEMS)
+
 async def get_or_create_user(email: str, db: AsyncSession) -> User:
     """Get or create a user by email."""
     result = await db.execute(select(User).where(User.email == email))
@@ -63,71 +139,233 @@ async def get_or_create_user(email: str, db: AsyncSession) -> User:
 def root():
     return RedirectResponse(url="/static/index.html")
 
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check an If-None-Match header against an entity tag.
+
+    Uses the weak comparison If-None-Match calls for, so strong and weak
+    forms of the same tag match.
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+@app.get("/metrics")
+def get_metrics():
+    """Expose in-process counters for scraping."""
+    return {
+        "catalog_cache": catalog_cache.stats(),
+        "auth_cache": principal_cache.stats(),
+        "permission_cache": permission_cache.stats(),
+        "password_pool": password_pool.stats(),
+        "db_pool": pool_metrics.stats(),
+        "read_replicas": read_router.stats(),
+        "audit_writer": audit_writer.stats(),
+        "seat_events": seat_events.stats()
+    }
+
 @app.get("/activities")
-async def get_activities(db: AsyncSession = Depends(get_db)):
-    """Get all activities with their participants."""
-    result = await db.execute(select(Activity))
-    activities = result.scalars().all()
-    
-    return [{
-        "name": activity.name,
-        "description": activity.description,
-        "schedule": activity.schedule,
-        "max_participants": activity.max_participants,
-        "club": activity.club.name if activity.club else None,
-        "participants": [p.email for p in activity.participants]
-    } for activity in activities]
+async def get_activities(
+    request: Request,
+    response: Response,
+    since: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get all activities with their participants.
+
+    With `since` (the X-Catalog-Version of an earlier response) only the
+    activities changed after that version are returned, together with the
+    new version.
+    """
+    # Clients that just wrote read their own changes straight from the primary
+    if reads_from_primary(request):
+        catalog = await catalog_cache.load(db)
+    else:
+        catalog = await catalog_cache.get(db)
+    headers = {"ETag": catalog.etag, "Cache-Control": "no-cache"}
+    if catalog.version:
+        headers["X-Catalog-Version"] = catalog.version
+    if etag_matches(request, catalog.etag):
+        # GZipMiddleware adds Vary to the bodies it may compress; a 304 has none
+        vary = {"Vary": "Accept-Encoding"} if GZIP_ENABLED else {}
+        return Response(status_code=304, headers={**headers, **vary})
+    if since is not None:
+        response.headers.update(headers)
+        return {"version": catalog.version, "activities": catalog.changed_since(since)}
+    # The cached body is already serialized
+    return Response(content=catalog.body, media_type="application/json", headers=headers)
+
+@app.get("/activities/stream")
+async def stream_seat_availability():
+    """Stream remaining seats per activity as Server-Sent Events.
+
+    A "snapshot" event with every activity is sent first, then "seats"
+    events with only the activities that changed since the last event.
+    """
+    if seat_events.full:
+        seat_events.rejected += 1
+        raise HTTPException(
+            status_code=503,
+            detail="Too many live connections",
+            headers={"Retry-After": "30"}
+        )
+
+    async def generate():
+        # Subscribed once streaming starts, so a client that goes away before
+        # the first chunk never holds a subscription
+        subscription = seat_events.subscribe()
+        if subscription is None:
+            # Filled up since the check above; ask the client to reconnect later
+            yield "retry: 30000\n\n"
+            return
+        try:
+            # Subscribed first, so no change can fall between snapshot and stream
+            async with AsyncSessionLocal() as session:
+                catalog = await catalog_cache.get(session)
+            snapshot = {
+                row["name"]: row["max_participants"] - len(row["participants"])
+                for row in catalog.rows
+            }
+            yield f"event: snapshot\ndata: {json.dumps(snapshot)}\n\n"
+            while True:
+                batch = await subscription.next_batch(SSE_HEARTBEAT_INTERVAL)
+                if batch is None:
+                    yield ": keep-alive\n\n"
+                else:
+                    yield f"event: seats\ndata: {json.dumps(batch)}\n\n"
+        finally:
+            seat_events.unsubscribe(subscription)
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def publish_seat_counts(db: AsyncSession, names):
+    """Publish the committed seat counts of the given activities."""
+    for name, seats_remaining in (await seat_counts(db, names)).items():
+        seat_events.publish(name, seats_remaining)
+
+@app.post("/activities/bulk/signup")
+async def bulk_signup_for_activities(
+    enrollment: BulkEnrollment,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(check_permission(["teacher", "admin"]))
+):
+    """Sign up many students at once. Only teachers and admins can do this."""
+    results = await bulk_signup(
+        db, [(item.activity, item.email) for item in enrollment.items]
+    )
+    await db.commit()
+    catalog_cache.invalidate()
+    await publish_seat_counts(db, [item.activity for item in enrollment.items])
+    remember_write(response)
+
+    return summarize_bulk_results(results)
+
+@app.post("/activities/bulk/unregister")
+async def bulk_unregister_from_activities(
+    enrollment: BulkEnrollment,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(check_permission(["teacher", "admin"]))
+):
+    """Unregister many students at once. Only teachers and admins can do this."""
+    results = await bulk_unregister(
+        db, [(item.activity, item.email) for item in enrollment.items]
+    )
+    await db.commit()
+    catalog_cache.invalidate()
+    await publish_seat_counts(db, [item.activity for item in enrollment.items])
+    remember_write(response)
+
+    return summarize_bulk_results(results)
 
 @app.post("/activities/{activity_name}/signup")
 async def signup_for_activity(
     activity_name: str,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Sign up a student for an activity."""
-    # Get activity
-    result = await db.execute(select(Activity).where(Activity.name == activity_name))
-    activity = result.scalar_one_or_none()
+    # Get activity; only its keys are needed, everything else is a keyed lookup
+    result = await db.execute(
+        select(Activity.id, Activity.club_id).where(Activity.name == activity_name)
+    )
+    activity = result.first()
     if not activity:
         raise HTTPException(status_code=404, detail="Activity not found")
     
-    # Check if activity is part of a club
-    if activity.club:
-        # Check if user is a member of the club
-        is_member = any(
-            member.user_id == current_user.id
-            for member in activity.club.members
-            if member.status == "active"
+    # Club activities need the participate permission in the club
+    if activity.club_id is not None and not await has_club_permission(
+        db, current_user, activity.club_id, ClubPermission.PARTICIPATE
+    ):
+        raise HTTPException(
+            status_code=403,
+            detail="You must be a club member to join this activity"
         )
-        if not is_member and current_user.role == "student":
-            raise HTTPException(
-                status_code=403,
-                detail="You must be a club member to join this activity"
-            )
     
     # Check if user is already signed up
-    if current_user in activity.participants:
+    if await is_participant(db, activity.id, current_user.id):
         raise HTTPException(
             status_code=400,
             detail="You are already signed up"
         )
     
-    # Check max participants
-    if len(activity.participants) >= activity.max_participants:
+    # Check for overlaps with the student's other activities
+    conflicts = await schedule_conflicts(db, activity.id, current_user.id)
+    if conflicts and SCHEDULE_CONFLICT_MODE == "reject":
         raise HTTPException(
-            status_code=400,
-            detail="Activity is full"
+            status_code=409,
+            detail=f"Schedule conflicts with: {', '.join(conflicts)}"
         )
     
-    # Add student to activity
-    activity.participants.append(current_user)
+    # Take a seat atomically, or join the waitlist if the activity is full
+    seats_remaining = await claim_seat(db, activity.id)
+    if seats_remaining is None:
+        position = await join_waitlist(db, activity.id, current_user.id)
+        if position is None:
+            # A concurrent request enrolled the user meanwhile
+            raise HTTPException(
+                status_code=400,
+                detail="You are already signed up"
+            )
+        await db.commit()
+        remember_write(response)
+        response.status_code = 202
+        return {
+            "message": f"{activity_name} is full, added to the waitlist",
+            "waitlist_position": position,
+            "schedule_conflicts": conflicts
+        }
+    
+    # Add student to activity (a concurrent duplicate gives back the seat)
+    if not await add_participant(db, activity.id, current_user.id):
+        await db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail="You are already signed up"
+        )
+    await leave_waitlist(db, activity.id, current_user.id)
     await db.commit()
+    catalog_cache.invalidate()
+    seat_events.publish(activity_name, seats_remaining)
+    remember_write(response)
     
-    return {"message": f"Signed up for {activity_name}"}
+    return {
+        "message": f"Signed up for {activity_name}",
+        "seats_remaining": seats_remaining,
+        "schedule_conflicts": conflicts
+    }
 
 @app.delete("/activities/{activity_name}/unregister")
 async def unregister_from_activity(
     activity_name: str,
+    response: Response,
     user_email: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -152,21 +390,49 @@ async def unregister_from_activity(
             detail="Only teachers and admins can unregister other users"
         )
     
-    # Check if user is signed up
-    if target_user not in activity.participants:
-        raise HTTPException(
-            status_code=400,
-            detail="Not signed up for this activity"
-        )
-    
-    # Remove from activity
-    activity.participants.remove(target_user)
+    # Remove from activity, or from its waitlist
+    if not await remove_participant(db, activity.id, target_user.id):
+        if not await leave_waitlist(db, activity.id, target_user.id):
+            raise HTTPException(
+                status_code=400,
+                detail="Not signed up for this activity"
+            )
+        await db.commit()
+        remember_write(response)
+        return {"message": f"Removed {target_user.email} from the {activity_name} waitlist"}
+    seats_remaining = await release_seat(db, activity.id)
+
+    # Hand the freed seat to the head of the waitlist
+    if await promote_from_waitlist(db, activity.id) is not None:
+        seats_remaining -= 1
     await db.commit()
+    catalog_cache.invalidate()
+    seat_events.publish(activity_name, seats_remaining)
+    remember_write(response)
     
     return {
         "message": (
             f"Unregistered {target_user.email} from {activity_name}"
             if user_email else
             f"Unregistered from {activity_name}"
-        )
+        ),
+        "seats_remaining": seats_remaining
+    }
+
+@app.get("/activities/{activity_name}/waitlist")
+async def get_waitlist_position(
+    activity_name: str,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the current user's waitlist position for an activity."""
+    result = await db.execute(select(Activity.id).where(Activity.name == activity_name))
+    activity_id = result.scalar_one_or_none()
+    if activity_id is None:
+        raise HTTPException(status_code=404, detail="Activity not found")
+
+    return {
+        "activity": activity_name,
+        "position": await waitlist_position(db, activity_id, current_user.id),
+        "waitlist_length": await waitlist_length(db, activity_id)
     }
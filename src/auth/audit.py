@@ -1,12 +1,144 @@
 """Audit logging utilities."""
-from fastapi import Request, Depends
+import asyncio
+import functools
+import logging
+import os
+import time
+from datetime import datetime
+from fastapi import Request
+from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional
+from typing import List, Optional
 
-from ..database.config import get_db
+from ..database.config import AsyncSessionLocal
 from ..database.audit import AuditLog
 from ..database.models import User
 
+logger = logging.getLogger(__name__)
+
+# "async" queues events for the background writer, "sync" commits each one
+AUDIT_MODE = os.getenv("AUDIT_MODE", "async")
+AUDIT_QUEUE_SIZE = int(os.getenv("AUDIT_QUEUE_SIZE", "10000"))
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "500"))
+AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", "1.0"))
+
+class AuditWriter:
+    """Background task that writes queued audit events in multi-row inserts.
+
+    A batch is flushed once it reaches AUDIT_BATCH_SIZE rows or
+    AUDIT_FLUSH_INTERVAL seconds after its first event. When the queue is
+    full new events are dropped and counted rather than blocking requests.
+    """
+
+    def __init__(self, queue_size: int, batch_size: int, flush_interval: float):
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.enqueued = 0
+        self.dropped = 0
+        self.written = 0
+        self.flushes = 0
+        self.flush_failures = 0
+        self.flush_seconds_total = 0.0
+        self.flush_seconds_max = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start the writer on the running event loop."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Flush everything still queued and stop the writer."""
+        if not self.running:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    def submit(self, row: dict) -> bool:
+        """Queue an event row; returns False if it had to be dropped."""
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        self.enqueued += 1
+        return True
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            row = await self._queue.get()
+            if row is None:
+                break
+            batch = [row]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    row = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if row is None:
+                    stopping = True
+                    break
+                batch.append(row)
+            await self._flush(batch)
+
+        # Drain whatever arrived before shutdown
+        remaining = []
+        while not self._queue.empty():
+            row = self._queue.get_nowait()
+            if row is not None:
+                remaining.append(row)
+        for start in range(0, len(remaining), self.batch_size):
+            await self._flush(remaining[start:start + self.batch_size])
+
+    async def _flush(self, rows: List[dict]):
+        started = time.perf_counter()
+        try:
+            async with AsyncSessionLocal() as session:
+                await session.execute(insert(AuditLog), rows)
+                await session.commit()
+        except Exception:
+            self.flush_failures += 1
+            logger.exception("Failed to write %d audit events", len(rows))
+            return
+        elapsed = time.perf_counter() - started
+        self.written += len(rows)
+        self.flushes += 1
+        self.flush_seconds_total += elapsed
+        self.flush_seconds_max = max(self.flush_seconds_max, elapsed)
+
+    def stats(self) -> dict:
+        return {
+            "mode": AUDIT_MODE,
+            "running": self.running,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "queue_size": self.queue_size,
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "written": self.written,
+            "flushes": self.flushes,
+            "flush_failures": self.flush_failures,
+            "flush_seconds_avg": (
+                self.flush_seconds_total / self.flushes if self.flushes else 0.0
+            ),
+            "flush_seconds_max": self.flush_seconds_max
+        }
+
+audit_writer = AuditWriter(AUDIT_QUEUE_SIZE, AUDIT_BATCH_SIZE, AUDIT_FLUSH_INTERVAL)
+
 async def log_event(
     db: AsyncSession,
     action: str,
@@ -17,44 +149,48 @@ async def log_event(
     request: Optional[Request] = None
 ):
     """Log an audit event."""
-    log_entry = AuditLog(
-        actor_id=actor.id if actor else None,
-        action=action,
-        entity_type=entity_type,
-        entity_id=entity_id,
-        details=details,
-        ip_address=request.client.host if request else None
-    )
-    db.add(log_entry)
+    row = {
+        "timestamp": datetime.utcnow(),
+        "actor_id": actor.id if actor else None,
+        "action": action,
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "details": details,
+        "ip_address": request.client.host if request and request.client else None
+    }
+    if AUDIT_MODE == "async" and audit_writer.running:
+        audit_writer.submit(row)
+        return
+
+    db.add(AuditLog(**row))
     await db.commit()
 
 def audit_log_middleware(action: str, entity_type: str):
-    """Decorator for automatic audit logging of API endpoints."""
+    """Decorator for automatic audit logging of API endpoints.
+
+    The endpoint must accept `request`, `db` and `current_user` parameters;
+    they are read from its keyword arguments after it returns.
+    """
     def decorator(func):
-        async def wrapper(
-            *args,
-            request: Request,
-            db: AsyncSession = Depends(get_db),
-            current_user: Optional[User] = None,
-            **kwargs
-        ):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
             # Execute the original function
             result = await func(*args, **kwargs)
-            
+
             # Log the event
             entity_id = result.get("id") if isinstance(result, dict) else None
             details = str(result) if result else None
-            
+
             await log_event(
-                db=db,
+                db=kwargs.get("db"),
                 action=action,
                 entity_type=entity_type,
-                actor=current_user,
+                actor=kwargs.get("current_user"),
                 entity_id=entity_id,
                 details=details,
-                request=request
+                request=kwargs.get("request")
             )
-            
+
             return result
         return wrapper
-    return decorator
\ No newline at end of file
+    return decorator
@@ -0,0 +1,182 @@
+"""Club role permissions.
+
+ClubRole.permissions holds text such as "all" or "view,participate" (a
+JSON list is accepted too). Each distinct string is parsed once into a
+ClubPermission bitset, and a user's effective permissions in a club are
+cached per (user, club). Cached entries are dropped when memberships or
+roles change, either through the ORM events below or by calling
+invalidate_club_permissions from Core write paths.
+"""
+import json
+import os
+from enum import IntFlag, auto
+from functools import lru_cache
+from typing import Iterable, Optional
+from fastapi import HTTPException, Depends
+from sqlalchemy import select, event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..cache import TTLCache
+from ..database.config import get_db
+from ..database.models import User, ClubMember, ClubRole
+from .security import get_current_user
+
+PERMISSION_CACHE_SIZE = int(os.getenv("PERMISSION_CACHE_SIZE", "50000"))
+PERMISSION_CACHE_TTL = float(os.getenv("PERMISSION_CACHE_TTL", "30"))
+
+class ClubPermission(IntFlag):
+    NONE = 0
+    VIEW = auto()
+    PARTICIPATE = auto()
+    MANAGE_MEMBERS = auto()
+    MANAGE_ACTIVITIES = auto()
+    MANAGE_BUDGET = auto()
+    ALL = VIEW | PARTICIPATE | MANAGE_MEMBERS | MANAGE_ACTIVITIES | MANAGE_BUDGET
+
+# School-wide roles that hold permissions in every club
+STAFF_PERMISSIONS = {
+    "admin": ClubPermission.ALL,
+    "teacher": ClubPermission.ALL
+}
+
+@lru_cache(maxsize=1024)
+def parse_permissions(text: Optional[str]) -> ClubPermission:
+    """Parse a role's permission text into a bitset; unknown names are ignored."""
+    text = (text or "").strip()
+    if text.startswith("["):
+        try:
+            names = json.loads(text)
+        except ValueError:
+            names = []
+    else:
+        names = text.split(",")
+    permissions = ClubPermission.NONE
+    for name in names:
+        flag = ClubPermission.__members__.get(str(name).strip().upper())
+        if flag is not None:
+            permissions |= flag
+    return permissions
+
+class ClubPermissionCache:
+    """Effective permissions per (user, club) with per-club invalidation.
+
+    Each club has a generation number, and a global epoch covers all clubs;
+    entries store the (epoch, generation) they were computed under and are
+    ignored once either moves on, so invalidating never has to find entries.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._generations: dict[int, int] = {}
+        self._epoch = 0
+        self.invalidations = 0
+
+    def generation(self, club_id: int) -> tuple[int, int]:
+        return self._epoch, self._generations.get(club_id, 0)
+
+    def get(self, user_id: int, club_id: int) -> Optional[ClubPermission]:
+        entry = self._cache.get((user_id, club_id))
+        if entry is None or entry[0] != self.generation(club_id):
+            return None
+        return entry[1]
+
+    def set(self, user_id: int, club_id: int, permissions: ClubPermission, generation: tuple[int, int]):
+        """Store permissions read while the club was at the given generation."""
+        self._cache.set((user_id, club_id), (generation, permissions))
+
+    def invalidate(self, club_id: Optional[int] = None):
+        """Forget cached permissions for one club, or for every club."""
+        self.invalidations += 1
+        if club_id is None:
+            self._epoch += 1
+            self._cache.clear()
+        else:
+            self._generations[club_id] = self._generations.get(club_id, 0) + 1
+
+    def stats(self) -> dict:
+        return {**self._cache.stats(), "invalidations": self.invalidations}
+
+permission_cache = ClubPermissionCache(PERMISSION_CACHE_SIZE, PERMISSION_CACHE_TTL)
+
+def invalidate_club_permissions(club_id: Optional[int] = None):
+    """Drop cached permissions after membership or role changes made outside the ORM."""
+    permission_cache.invalidate(club_id)
+
+@event.listens_for(ClubMember, "after_insert")
+@event.listens_for(ClubMember, "after_update")
+@event.listens_for(ClubMember, "after_delete")
+@event.listens_for(ClubRole, "after_update")
+@event.listens_for(ClubRole, "after_delete")
+def _invalidate_changed_club(mapper, connection, target):
+    permission_cache.invalidate(target.club_id)
+
+async def get_club_permissions(db: AsyncSession, user_id: int, club_id: int) -> ClubPermission:
+    """A user's permissions from their active membership in a club."""
+    permissions = permission_cache.get(user_id, club_id)
+    if permissions is not None:
+        return permissions
+
+    # Taken before the query, so a change committed meanwhile invalidates the result
+    generation = permission_cache.generation(club_id)
+    result = await db.execute(
+        select(ClubRole.permissions)
+        .join(ClubMember, ClubMember.role_id == ClubRole.id)
+        .where(ClubMember.club_id == club_id)
+        .where(ClubMember.user_id == user_id)
+        .where(ClubMember.status == "active")
+    )
+    permissions = parse_permissions(result.scalar_one_or_none())
+    permission_cache.set(user_id, club_id, permissions, generation)
+    return permissions
+
+async def get_member_permissions(
+    db: AsyncSession,
+    club_ids: Iterable[int],
+    user_ids: Iterable[int]
+) -> dict[tuple[int, int], ClubPermission]:
+    """Permissions of many users in many clubs, keyed by (club_id, user_id).
+
+    Reads all active memberships with one IN query, for batch endpoints that
+    would otherwise check each pair separately. Pairs without an active
+    membership are absent.
+    """
+    club_ids, user_ids = set(club_ids), set(user_ids)
+    if not club_ids or not user_ids:
+        return {}
+    result = await db.execute(
+        select(ClubMember.club_id, ClubMember.user_id, ClubRole.permissions)
+        .join(ClubRole, ClubMember.role_id == ClubRole.id)
+        .where(ClubMember.club_id.in_(club_ids))
+        .where(ClubMember.user_id.in_(user_ids))
+        .where(ClubMember.status == "active")
+    )
+    return {
+        (row.club_id, row.user_id): parse_permissions(row.permissions)
+        for row in result
+    }
+
+async def has_club_permission(
+    db: AsyncSession,
+    user: User,
+    club_id: int,
+    permission: ClubPermission
+) -> bool:
+    """Whether a user holds a permission in a club, directly or as staff."""
+    if permission in STAFF_PERMISSIONS.get(user.role, ClubPermission.NONE):
+        return True
+    return permission in await get_club_permissions(db, user.id, club_id)
+
+def require_club_permission(permission: ClubPermission):
+    """Dependency requiring a permission in the club named by the club_id path parameter."""
+    async def wrapper(
+        club_id: int,
+        db: AsyncSession = Depends(get_db),
+        current_user: User = Depends(get_current_user)
+    ):
+        if not await has_club_permission(db, current_user, club_id, permission):
+            raise HTTPException(
+                status_code=403,
+                detail="You don't have permission to perform this action"
+            )
+        return current_user
+    return wrapper
@@ -1,12 +1,20 @@
 """Security utilities for authentication and authorization."""
+import asyncio
+import hashlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, Depends
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select, event, inspect
+from sqlalchemy.orm import make_transient_to_detached
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..cache import TTLCache
 from ..database.config import get_db
 from ..database.models import User
 
@@ -15,12 +23,60 @@ SECRET_KEY = "your-secret-key-here"  # TODO: Move to environment variables
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# Validated token cache
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "10000"))
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "60"))
+
+# Password hashing pool
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+# Validated tokens keyed by SHA-256 of the token, plus a reverse index by
+# email so a user's entries can be dropped when their account changes
+principal_cache = TTLCache(maxsize=AUTH_CACHE_SIZE, ttl=AUTH_CACHE_TTL)
+_cached_tokens_by_email: dict[str, set[str]] = {}
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def _cache_principal(key: str, user: User, expires_at: float):
+    """Cache a validated user until the token expires or the TTL passes.
+
+    A detached copy of the loaded columns is cached, so a rollback of the
+    request that loaded the user cannot expire the cached instance.
+    """
+    snapshot = User(**{
+        attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs
+    })
+    make_transient_to_detached(snapshot)
+    principal_cache.set(key, snapshot, ttl=min(AUTH_CACHE_TTL, expires_at - time.time()))
+    keys = {k for k in _cached_tokens_by_email.get(user.email, ()) if k in principal_cache}
+    keys.add(key)
+    _cached_tokens_by_email[user.email] = keys
+
+def invalidate_user(email: str):
+    """Forget every cached token for a user."""
+    for key in _cached_tokens_by_email.pop(email, ()):
+        principal_cache.pop(key)
+
+@event.listens_for(User, "after_update")
+def _invalidate_changed_user(mapper, connection, target):
+    """Drop cached tokens when a user's role, status or email changes."""
+    state = inspect(target)
+    for attr in ("role", "is_active", "email"):
+        history = state.attrs[attr].history
+        if history.has_changes():
+            invalidate_user(target.email)
+            for old_email in history.deleted or ():
+                invalidate_user(old_email)
+            return
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
     return pwd_context.verify(plain_password, hashed_password)
@@ -29,6 +85,58 @@ def get_password_hash(password: str) -> str:
     """Hash a password."""
     return pwd_context.hash(password)
 
+class PasswordHashPool:
+    """Bounded worker pool that keeps bcrypt off the event loop.
+
+    bcrypt releases the GIL, so a small thread pool runs hashes in
+    parallel. Once PASSWORD_HASH_MAX_PENDING jobs are queued or running,
+    new requests are rejected with 429 instead of piling up.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix="password-hash"
+        )
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    async def run(self, func, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=429,
+                detail="Too many authentication requests, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+
+    def stats(self) -> dict:
+        return {
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected
+        }
+
+password_pool = PasswordHashPool(PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the hashing pool."""
+    return await password_pool.run(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the hashing pool."""
+    return await password_pool.run(get_password_hash, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
     to_encode = data.copy()
@@ -50,6 +158,12 @@ async def get_current_user(
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    key = _token_key(token)
+    user = principal_cache.get(key)
+    if user is not None:
+        # Attach the cached instance to this session without a query
+        return await db.merge(user, load=False)
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
@@ -58,15 +172,11 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
     
-    result = await db.execute(
-        """
-        SELECT * FROM users WHERE email = :email
-        """,
-        {"email": email}
-    )
+    result = await db.execute(select(User).where(User.email == email))
     user = result.scalar_one_or_none()
-    if user is None:
+    if user is None or not user.is_active:
         raise credentials_exception
+    _cache_principal(key, user, payload.get("exp", 0))
     return user
 
 def check_permission(required_roles: list[str]):
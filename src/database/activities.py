@@ -0,0 +1,494 @@
+"""Query helpers for reading and updating activities."""
+import hashlib
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from collections import Counter
+from typing import Iterable, List, Optional, Tuple
+from sqlalchemy import DateTime, select, insert, delete, update, exists, func, literal, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..auth.permissions import ClubPermission, STAFF_PERMISSIONS, get_member_permissions
+from ..cache import TTLCache
+from ..responses import dumps
+from .config import settings
+from .dialect import naive_utc, upsert_insert
+from .models import Activity, Club, User, WaitlistEntry, activity_participants
+
+# Seconds a cached catalog may be served before it is reloaded
+CATALOG_CACHE_TTL = float(os.getenv("CATALOG_CACHE_TTL", "30"))
+# Seconds of changes re-sent before a delta request's version
+CATALOG_DELTA_OVERLAP = float(os.getenv("CATALOG_DELTA_OVERLAP", "5"))
+
+async def fetch_activity_catalog(db: AsyncSession) -> List[dict]:
+    """Load the activity catalog as response rows in two queries.
+
+    Activities are joined to their club name in one query and participant
+    emails are fetched in a second, so no ORM objects (and no lazy loads)
+    are created regardless of catalog size.
+    """
+    # Activities with their club name
+    result = await db.execute(
+        select(
+            Activity.id,
+            Activity.name,
+            Activity.description,
+            Activity.schedule,
+            Activity.max_participants,
+            Activity.updated_at,
+            Club.name.label("club")
+        )
+        .outerjoin(Club, Activity.club_id == Club.id)
+        .order_by(Activity.name)
+    )
+    rows = {}
+    for row in result:
+        rows[row.id] = {
+            "name": row.name,
+            "description": row.description,
+            "schedule": row.schedule,
+            "max_participants": row.max_participants,
+            "club": row.club,
+            "participants": [],
+            "updated_at": row.updated_at.isoformat(timespec="microseconds")
+        }
+
+    # Participant emails for all activities
+    result = await db.execute(
+        select(activity_participants.c.activity_id, User.email)
+        .join(User, User.id == activity_participants.c.user_id)
+        .order_by(activity_participants.c.activity_id, User.email)
+    )
+    for activity_id, email in result:
+        if activity_id in rows:
+            rows[activity_id]["participants"].append(email)
+
+    return list(rows.values())
+
+async def is_participant(db: AsyncSession, activity_id: int, user_id: int) -> bool:
+    """Check participation with a primary key existence lookup."""
+    result = await db.execute(
+        select(exists().where(
+            activity_participants.c.activity_id == activity_id,
+            activity_participants.c.user_id == user_id
+        ))
+    )
+    return result.scalar()
+
+async def add_participant(db: AsyncSession, activity_id: int, user_id: int) -> bool:
+    """Insert a participant row; returns False if the user is already signed up.
+
+    The duplicate check relies on the activity_participants primary key, so
+    it also catches concurrent signups by the same user. On False the
+    transaction is unusable and the caller must roll back.
+    """
+    try:
+        await db.execute(
+            insert(activity_participants).values(
+                activity_id=activity_id,
+                user_id=user_id
+            )
+        )
+    except IntegrityError:
+        return False
+    return True
+
+async def remove_participant(db: AsyncSession, activity_id: int, user_id: int) -> bool:
+    """Delete a participant row; returns False if the user was not signed up."""
+    result = await db.execute(
+        delete(activity_participants)
+        .where(activity_participants.c.activity_id == activity_id)
+        .where(activity_participants.c.user_id == user_id)
+    )
+    return result.rowcount > 0
+
+async def claim_seat(db: AsyncSession, activity_id: int) -> Optional[int]:
+    """Atomically take one seat on an activity.
+
+    The conditional UPDATE holds the activity row lock until commit, so
+    concurrent signups are serialized by the database and can never push
+    the count past max_participants. Returns the seats remaining after the
+    claim, or None if the activity was already full.
+    """
+    result = await db.execute(
+        update(Activity)
+        .where(Activity.id == activity_id)
+        .where(Activity.participant_count < Activity.max_participants)
+        .values(participant_count=Activity.participant_count + 1)
+        .returning(Activity.max_participants - Activity.participant_count)
+    )
+    return result.scalar_one_or_none()
+
+async def release_seat(db: AsyncSession, activity_id: int) -> int:
+    """Give back one seat on an activity; returns the seats remaining."""
+    result = await db.execute(
+        update(Activity)
+        .where(Activity.id == activity_id)
+        .where(Activity.participant_count > 0)
+        .values(participant_count=Activity.participant_count - 1)
+        .returning(Activity.max_participants - Activity.participant_count)
+    )
+    return result.scalar_one_or_none() or 0
+
+async def seat_counts(db: AsyncSession, names: Iterable[str]) -> dict:
+    """Return the seats remaining for each named activity."""
+    result = await db.execute(
+        select(Activity.name, Activity.max_participants - Activity.participant_count)
+        .where(Activity.name.in_(set(names)))
+    )
+    return dict(result.all())
+
+async def waitlist_position(db: AsyncSession, activity_id: int, user_id: int) -> Optional[int]:
+    """Return the 1-based waitlist position of a user, or None if not queued."""
+    own_entry = (
+        select(WaitlistEntry.id)
+        .where(WaitlistEntry.activity_id == activity_id)
+        .where(WaitlistEntry.user_id == user_id)
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        select(func.count(WaitlistEntry.id))
+        .where(WaitlistEntry.activity_id == activity_id)
+        .where(WaitlistEntry.id <= own_entry)
+    )
+    position = result.scalar_one()
+    return position or None
+
+async def waitlist_length(db: AsyncSession, activity_id: int) -> int:
+    """Return the number of users waiting for an activity."""
+    result = await db.execute(
+        select(func.count(WaitlistEntry.id))
+        .where(WaitlistEntry.activity_id == activity_id)
+    )
+    return result.scalar_one()
+
+async def join_waitlist(db: AsyncSession, activity_id: int, user_id: int) -> Optional[int]:
+    """Append a user to the waitlist and return their position.
+
+    The insert skips users who are already queued, so they keep their
+    place, and concurrent joins by the same user cannot hit the unique
+    constraint. Participants are never queued; None is returned for them.
+    """
+    not_participant = ~exists().where(
+        activity_participants.c.activity_id == activity_id,
+        activity_participants.c.user_id == user_id
+    )
+    await db.execute(
+        upsert_insert(db, WaitlistEntry.__table__)
+        .from_select(
+            ["activity_id", "user_id", "created_at"],
+            select(
+                literal(activity_id),
+                literal(user_id),
+                literal(datetime.utcnow(), DateTime)
+            ).where(not_participant)
+        )
+        .on_conflict_do_nothing(index_elements=["activity_id", "user_id"])
+    )
+    return await waitlist_position(db, activity_id, user_id)
+
+async def leave_waitlist(db: AsyncSession, activity_id: int, user_id: int) -> bool:
+    """Remove a user from the waitlist; returns False if they were not queued."""
+    result = await db.execute(
+        delete(WaitlistEntry)
+        .where(WaitlistEntry.activity_id == activity_id)
+        .where(WaitlistEntry.user_id == user_id)
+    )
+    return result.rowcount > 0
+
+async def promote_from_waitlist(db: AsyncSession, activity_id: int) -> Optional[int]:
+    """Move the head of the waitlist into a free seat.
+
+    Runs in the caller's transaction, right after a seat was released.
+    SKIP LOCKED lets concurrent unregisters promote different users.
+    Entries of users who are already participants are dropped and the next
+    user is tried. Returns the promoted user id, or None if nobody was
+    waiting.
+    """
+    while True:
+        result = await db.execute(
+            select(WaitlistEntry.id, WaitlistEntry.user_id)
+            .where(WaitlistEntry.activity_id == activity_id)
+            .order_by(WaitlistEntry.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        head = result.first()
+        if head is None:
+            return None
+
+        if await is_participant(db, activity_id, head.user_id):
+            await db.execute(delete(WaitlistEntry).where(WaitlistEntry.id == head.id))
+            continue
+        if await claim_seat(db, activity_id) is None:
+            return None
+        await db.execute(delete(WaitlistEntry).where(WaitlistEntry.id == head.id))
+        await db.execute(
+            insert(activity_participants).values(
+                activity_id=activity_id,
+                user_id=head.user_id
+            )
+        )
+        return head.user_id
+
+async def _resolve_bulk_items(db: AsyncSession, items: List[Tuple[str, str]]):
+    """Load the activities, users and existing participations for a batch.
+
+    Activity rows are locked in id order so concurrent batches cannot
+    interleave their seat accounting.
+    """
+    names = {name for name, _ in items}
+    emails = {email for _, email in items}
+
+    result = await db.execute(
+        select(
+            Activity.id,
+            Activity.name,
+            Activity.club_id,
+            Activity.max_participants,
+            Activity.participant_count
+        )
+        .where(Activity.name.in_(names))
+        .order_by(Activity.id)
+        .with_for_update()
+    )
+    activities = {row.name: row for row in result}
+
+    result = await db.execute(
+        select(User.id, User.email, User.role).where(User.email.in_(emails))
+    )
+    users = {row.email: row for row in result}
+
+    activity_ids = [row.id for row in activities.values()]
+    user_ids = [row.id for row in users.values()]
+    result = await db.execute(
+        select(activity_participants.c.activity_id, activity_participants.c.user_id)
+        .where(activity_participants.c.activity_id.in_(activity_ids))
+        .where(activity_participants.c.user_id.in_(user_ids))
+    )
+    participations = {(row.activity_id, row.user_id) for row in result}
+
+    return activities, users, participations
+
+def summarize_bulk_results(results: List[dict]) -> dict:
+    """Wrap per-item bulk results with success/failure counts."""
+    failed = sum(1 for item in results if item["status"] == "error")
+    return {
+        "succeeded": len(results) - failed,
+        "failed": failed,
+        "results": results
+    }
+
+async def bulk_signup(db: AsyncSession, items: Iterable[Tuple[str, str]]) -> List[dict]:
+    """Enroll many (activity name, email) pairs in a fixed number of queries.
+
+    Users, activities, existing participations and club permissions are
+    each resolved with one IN query, participants are added with a single
+    multi-row insert and each activity's counter is bumped once. Returns
+    one result per item, in input order.
+    """
+    items = list(items)
+    activities, users, participations = await _resolve_bulk_items(db, items)
+
+    # Club permissions of users enrolling in club activities, staff aside
+    member_permissions = await get_member_permissions(
+        db,
+        {row.club_id for row in activities.values() if row.club_id},
+        {row.id for row in users.values() if row.role not in STAFF_PERMISSIONS}
+    )
+
+    seats = {
+        row.id: row.max_participants - row.participant_count
+        for row in activities.values()
+    }
+    results = []
+    new_rows = []
+    for name, email in items:
+        activity = activities.get(name)
+        user = users.get(email)
+        if activity is None:
+            detail = "Activity not found"
+        elif user is None:
+            detail = "User not found"
+        elif (activity.id, user.id) in participations:
+            detail = "Already signed up"
+        elif activity.club_id and ClubPermission.PARTICIPATE not in (
+            STAFF_PERMISSIONS.get(user.role, ClubPermission.NONE)
+            | member_permissions.get((activity.club_id, user.id), ClubPermission.NONE)
+        ):
+            detail = "User must be a club member to join this activity"
+        elif seats[activity.id] <= 0:
+            detail = "Activity is full"
+        else:
+            detail = None
+            seats[activity.id] -= 1
+            participations.add((activity.id, user.id))
+            new_rows.append({"activity_id": activity.id, "user_id": user.id})
+
+        results.append({
+            "activity": name,
+            "email": email,
+            "status": "error" if detail else "enrolled",
+            "detail": detail
+        })
+
+    if new_rows:
+        await db.execute(insert(activity_participants), new_rows)
+        # Enrolled users give up their places in the waitlist
+        await db.execute(
+            delete(WaitlistEntry).where(
+                tuple_(WaitlistEntry.activity_id, WaitlistEntry.user_id).in_(
+                    [(row["activity_id"], row["user_id"]) for row in new_rows]
+                )
+            )
+        )
+        added = Counter(row["activity_id"] for row in new_rows)
+        for activity_id, count in added.items():
+            await db.execute(
+                update(Activity)
+                .where(Activity.id == activity_id)
+                .values(participant_count=Activity.participant_count + count)
+            )
+
+    return results
+
+async def bulk_unregister(db: AsyncSession, items: Iterable[Tuple[str, str]]) -> List[dict]:
+    """Remove many (activity name, email) pairs in a fixed number of queries.
+
+    Freed seats are offered to each activity's waitlist in the same
+    transaction. Returns one result per item, in input order.
+    """
+    items = list(items)
+    activities, users, participations = await _resolve_bulk_items(db, items)
+
+    results = []
+    removed = set()
+    for name, email in items:
+        activity = activities.get(name)
+        user = users.get(email)
+        if activity is None:
+            detail = "Activity not found"
+        elif user is None:
+            detail = "User not found"
+        elif (activity.id, user.id) not in participations - removed:
+            detail = "Not signed up for this activity"
+        else:
+            detail = None
+            removed.add((activity.id, user.id))
+
+        results.append({
+            "activity": name,
+            "email": email,
+            "status": "error" if detail else "unregistered",
+            "detail": detail
+        })
+
+    if removed:
+        await db.execute(
+            delete(activity_participants).where(
+                tuple_(
+                    activity_participants.c.activity_id,
+                    activity_participants.c.user_id
+                ).in_(removed)
+            )
+        )
+        freed = Counter(activity_id for activity_id, _ in removed)
+        for activity_id, count in freed.items():
+            await db.execute(
+                update(Activity)
+                .where(Activity.id == activity_id)
+                .values(participant_count=Activity.participant_count - count)
+            )
+            for _ in range(count):
+                if await promote_from_waitlist(db, activity_id) is None:
+                    break
+
+    return results
+
+@dataclass(frozen=True)
+class CachedCatalog:
+    """Serialized activity catalog together with its entity tag and version.
+
+    `body` holds the rows already encoded as JSON, so full catalog
+    responses are written without serializing the rows again.
+
+    The version is the latest updated_at of any activity; clients pass it
+    back as `since` to fetch only the activities changed after it.
+    """
+    rows: List[dict]
+    body: bytes
+    etag: str
+    version: Optional[str]
+
+    def changed_since(self, since: datetime) -> List[dict]:
+        """Rows updated after `since`, minus CATALOG_DELTA_OVERLAP seconds.
+
+        The overlap re-sends recent rows so that a write whose timestamp
+        was taken before the client's version, but committed after it, is
+        still delivered. Clients apply rows idempotently.
+        """
+        since = naive_utc(since)
+        threshold = (since - timedelta(seconds=CATALOG_DELTA_OVERLAP)).isoformat(timespec="microseconds")
+        return [row for row in self.rows if row["updated_at"] > threshold]
+
+class ActivityCatalogCache:
+    """Versioned, TTL-bounded cache of the activity catalog.
+
+    Writers call `invalidate()` after committing. The version counter
+    guards against a slow reload storing rows that were read before a
+    concurrent invalidation. A replica may not have applied the write yet,
+    so catalogs read from a replica are only stored once the
+    read-your-writes window has passed since the last invalidation.
+    """
+
+    KEY = "catalog"
+
+    def __init__(self, ttl: float = CATALOG_CACHE_TTL):
+        self._cache = TTLCache(maxsize=1, ttl=ttl)
+        self.version = 0
+        self.invalidated_at = 0.0
+
+    async def get(self, db: AsyncSession) -> CachedCatalog:
+        """Return the cached catalog, reloading it from the database on a miss."""
+        catalog = self._cache.get(self.KEY)
+        if catalog is not None:
+            return catalog
+
+        version = self.version
+        catalog = await self.load(db)
+        if version == self.version and not self._may_be_stale(db):
+            self._cache.set(self.KEY, catalog)
+        return catalog
+
+    def _may_be_stale(self, db: AsyncSession) -> bool:
+        """Whether the session is a replica that may lag the last invalidation."""
+        return (
+            db.info.get("replica", False)
+            and time.monotonic() - self.invalidated_at < settings.read_your_writes_window
+        )
+
+    async def load(self, db: AsyncSession) -> CachedCatalog:
+        """Read the catalog from the database without touching the cache."""
+        rows = await fetch_activity_catalog(db)
+        body = dumps(rows)
+        return CachedCatalog(
+            rows=rows,
+            body=body,
+            # Weak: gzip and identity encodings of the body share the tag
+            etag=f'W/"{hashlib.sha1(body).hexdigest()}"',
+            version=max((row["updated_at"] for row in rows), default=None)
+        )
+
+    def invalidate(self):
+        """Drop the cached catalog after a write."""
+        self.version += 1
+        self.invalidated_at = time.monotonic()
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        """Return cache counters and the current version."""
+        return {**self._cache.stats(), "version": self.version}
+
+catalog_cache = ActivityCatalogCache()
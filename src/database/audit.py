@@ -1,13 +1,21 @@
 """Audit logging module for tracking system events."""
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import String, Integer, DateTime, ForeignKey
+from sqlalchemy import String, Integer, DateTime, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from .config import Base
 
 class AuditLog(Base):
     """Audit log model for tracking system events."""
     __tablename__ = "audit_logs"
+    # Composite indexes matching the /audit filters, each ending in the
+    # (timestamp, id) keyset so pages are read straight off the index
+    __table_args__ = (
+        Index("ix_audit_logs_timestamp_id", "timestamp", "id"),
+        Index("ix_audit_logs_actor_id_timestamp", "actor_id", "timestamp", "id"),
+        Index("ix_audit_logs_action_timestamp", "action", "timestamp", "id"),
+        Index("ix_audit_logs_entity_timestamp", "entity_type", "entity_id", "timestamp", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     timestamp: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
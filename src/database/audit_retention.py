@@ -0,0 +1,179 @@
+"""Retention job for the monthly audit_logs partitions (PostgreSQL).
+
+Creates partitions ahead of time, and archives partitions older than the
+retention period: their rows are streamed to a gzip-compressed JSONL file
+and the partition is then detached and dropped.
+
+Events outside every monthly range land in audit_logs_default. When a
+month's partition is created, the default's rows for that month are moved
+into it (PostgreSQL refuses the partition otherwise). Default rows older
+than the retention period are archived and deleted like a partition.
+
+Usage:
+    python -m src.database.audit_retention --keep-months 12 --archive-dir archive/audit
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import List
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from .config import engine
+
+PARTITION_PATTERN = re.compile(r"^audit_logs_p(\d{4})_(\d{2})$")
+DEFAULT_PARTITION = "audit_logs_default"
+
+def month_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1)
+
+def add_months(month: datetime, count: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + count
+    return datetime(index // 12, index % 12 + 1, 1)
+
+def partition_name(month: datetime) -> str:
+    return f"audit_logs_p{month:%Y_%m}"
+
+async def list_partitions(conn: AsyncConnection) -> List[datetime]:
+    """Return the months that have an attached partition, oldest first."""
+    result = await conn.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "WHERE parent.relname = 'audit_logs'"
+    ))
+    months = []
+    for (name,) in result:
+        match = PARTITION_PATTERN.match(name)
+        if match:
+            months.append(datetime(int(match.group(1)), int(match.group(2)), 1))
+    return sorted(months)
+
+def month_range(month: datetime) -> str:
+    return f"timestamp >= '{month:%Y-%m-%d}' AND timestamp < '{add_months(month, 1):%Y-%m-%d}'"
+
+async def create_partition(conn: AsyncConnection, month: datetime) -> int:
+    """Create one month's partition; returns the rows moved into it from the default.
+
+    PostgreSQL rejects a new partition while the default partition holds
+    rows in its range, so in that case the default is detached, its rows
+    for the month are moved into the new partition and it is re-attached,
+    all in the caller's transaction.
+    """
+    name = partition_name(month)
+    bounds = f"FROM ('{month:%Y-%m-%d}') TO ('{add_months(month, 1):%Y-%m-%d}')"
+    stray = await conn.scalar(text(
+        f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE {month_range(month)})"
+    ))
+    if not stray:
+        await conn.execute(text(f"CREATE TABLE {name} PARTITION OF audit_logs FOR VALUES {bounds}"))
+        return 0
+
+    await conn.execute(text(f"ALTER TABLE audit_logs DETACH PARTITION {DEFAULT_PARTITION}"))
+    await conn.execute(text(f"CREATE TABLE {name} PARTITION OF audit_logs FOR VALUES {bounds}"))
+    result = await conn.execute(text(
+        f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE {month_range(month)} RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved"
+    ))
+    await conn.execute(text(f"ALTER TABLE audit_logs ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+    return result.rowcount
+
+async def ensure_partitions(conn: AsyncConnection, months_ahead: int) -> List[dict]:
+    """Create partitions for the current month and the next few."""
+    existing = set(await list_partitions(conn))
+    created = []
+    current = month_start(datetime.utcnow())
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        if month in existing:
+            continue
+        moved = await create_partition(conn, month)
+        created.append({"partition": partition_name(month), "moved": moved})
+    return created
+
+async def export_rows(conn: AsyncConnection, query: str, path: Path) -> int:
+    """Stream a query's rows to a gzip JSONL file; returns the row count."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    rows = 0
+    result = await conn.stream(text(query).execution_options(yield_per=5000))
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as archive:
+        async for row in result:
+            archive.write(json.dumps(dict(row._mapping), default=str) + "\n")
+            rows += 1
+    tmp_path.replace(path)
+    return rows
+
+async def export_partition(conn: AsyncConnection, month: datetime, archive_dir: Path) -> int:
+    """Stream one partition to a gzip JSONL file; returns the row count."""
+    name = partition_name(month)
+    return await export_rows(
+        conn, f"SELECT * FROM {name} ORDER BY timestamp, id", archive_dir / f"{name}.jsonl.gz"
+    )
+
+async def archive_default_rows(conn: AsyncConnection, cutoff: datetime, archive_dir: Path) -> int:
+    """Export and delete default-partition rows older than `cutoff`; returns the row count."""
+    expired = f"timestamp < '{cutoff:%Y-%m-%d}'"
+    if not await conn.scalar(text(f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE {expired})")):
+        return 0
+    # Named after the run, so earlier exports of the default are never overwritten
+    path = archive_dir / f"{DEFAULT_PARTITION}_{datetime.utcnow():%Y_%m_%d_%H%M%S}.jsonl.gz"
+    rows = await export_rows(
+        conn, f"SELECT * FROM {DEFAULT_PARTITION} WHERE {expired} ORDER BY timestamp, id", path
+    )
+    await conn.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {expired}"))
+    await conn.commit()
+    return rows
+
+async def archive_old_partitions(conn: AsyncConnection, keep_months: int, archive_dir: Path) -> List[dict]:
+    """Export, detach and drop partitions older than the retention period.
+
+    Rows of the default partition older than the period are exported and
+    deleted too.
+    """
+    cutoff = add_months(month_start(datetime.utcnow()), -keep_months)
+    archived = []
+    for month in await list_partitions(conn):
+        if month >= cutoff:
+            break
+        rows = await export_partition(conn, month, archive_dir)
+        name = partition_name(month)
+        await conn.execute(text(f"ALTER TABLE audit_logs DETACH PARTITION {name}"))
+        await conn.execute(text(f"DROP TABLE {name}"))
+        await conn.commit()
+        archived.append({"partition": name, "rows": rows})
+    rows = await archive_default_rows(conn, cutoff, archive_dir)
+    if rows:
+        archived.append({"partition": DEFAULT_PARTITION, "rows": rows})
+    return archived
+
+async def run(keep_months: int, months_ahead: int, archive_dir: Path):
+    async with engine.connect() as conn:
+        created = await ensure_partitions(conn, months_ahead)
+        await conn.commit()
+        archived = await archive_old_partitions(conn, keep_months, archive_dir)
+    await engine.dispose()
+
+    for item in created:
+        moved = f" ({item['moved']} rows moved from {DEFAULT_PARTITION})" if item["moved"] else ""
+        print(f"created {item['partition']}{moved}")
+    for item in archived:
+        print(f"archived {item['partition']} ({item['rows']} rows)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--keep-months", type=int, default=12,
+                        help="months of audit events kept in the database")
+    parser.add_argument("--months-ahead", type=int, default=3,
+                        help="future monthly partitions to create")
+    parser.add_argument("--archive-dir", type=Path, default=Path("archive/audit"),
+                        help="directory for exported partitions")
+    args = parser.parse_args()
+    asyncio.run(run(args.keep_months, args.months_ahead, args.archive_dir))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Maintained counter columns and the command that checks them.
+
+Membership counters on clubs and club roles, and participant counts on
+activities, are updated in the same transaction as the rows they count.
+This module holds the membership update helpers and a consistency check
+that recomputes every counter in bulk and reports (or repairs) drift.
+
+Usage:
+    python -m src.database.counters [--repair]
+"""
+import argparse
+import asyncio
+from typing import List, Optional
+from sqlalchemy import select, update, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import AsyncSessionLocal, engine
+from .models import Activity, Club, ClubMember, ClubRole, activity_participants
+
+# Club counter column for each membership status
+STATUS_COUNTERS = {
+    "active": Club.active_member_count,
+    "pending": Club.pending_member_count,
+    "inactive": Club.inactive_member_count
+}
+
+async def claim_member_slot(db: AsyncSession, club_id: int, role_id: int) -> bool:
+    """Atomically count one more active member, respecting max_members.
+
+    Returns False if the club is already at capacity. The conditional
+    UPDATE holds the club row lock until commit, so concurrent additions
+    cannot overfill the club.
+    """
+    result = await db.execute(
+        update(Club)
+        .where(Club.id == club_id)
+        .where(or_(
+            Club.max_members.is_(None),
+            Club.active_member_count < Club.max_members
+        ))
+        .values(active_member_count=Club.active_member_count + 1)
+        .returning(Club.id)
+    )
+    if result.scalar_one_or_none() is None:
+        return False
+    await db.execute(
+        update(ClubRole)
+        .where(ClubRole.id == role_id)
+        .values(member_count=ClubRole.member_count + 1)
+    )
+    return True
+
+async def record_membership_change(
+    db: AsyncSession,
+    club_id: int,
+    role_id: Optional[int],
+    old_status: Optional[str],
+    new_status: Optional[str],
+    count: int = 1
+):
+    """Adjust club and role counters for memberships moving between statuses.
+
+    Use None as old_status for new memberships and as new_status for
+    removed ones. Role counters track active members only.
+    """
+    values = {}
+    if old_status in STATUS_COUNTERS:
+        column = STATUS_COUNTERS[old_status]
+        values[column.key] = column - count
+    if new_status in STATUS_COUNTERS:
+        column = STATUS_COUNTERS[new_status]
+        values[column.key] = values.get(column.key, column) + count
+    if values:
+        await db.execute(update(Club).where(Club.id == club_id).values(values))
+
+    role_delta = (new_status == "active") - (old_status == "active")
+    if role_id is not None and role_delta:
+        await db.execute(
+            update(ClubRole)
+            .where(ClubRole.id == role_id)
+            .values(member_count=ClubRole.member_count + role_delta * count)
+        )
+
+def _club_status_count(status: str):
+    return (
+        select(func.count(ClubMember.id))
+        .where(ClubMember.club_id == Club.id)
+        .where(ClubMember.status == status)
+        .scalar_subquery()
+    )
+
+# (name, model, stored column, recomputed value)
+COUNTERS = [
+    *[
+        (f"clubs.{column.key}", Club, column, _club_status_count(status))
+        for status, column in STATUS_COUNTERS.items()
+    ],
+    (
+        "club_roles.member_count",
+        ClubRole,
+        ClubRole.member_count,
+        select(func.count(ClubMember.id))
+        .where(ClubMember.role_id == ClubRole.id)
+        .where(ClubMember.status == "active")
+        .scalar_subquery()
+    ),
+    (
+        "activities.participant_count",
+        Activity,
+        Activity.participant_count,
+        select(func.count())
+        .select_from(activity_participants)
+        .where(activity_participants.c.activity_id == Activity.id)
+        .scalar_subquery()
+    )
+]
+
+async def find_drift(db: AsyncSession) -> List[dict]:
+    """Recompute every counter and return the rows whose stored value is wrong."""
+    drift = []
+    for name, model, column, actual in COUNTERS:
+        result = await db.execute(
+            select(model.id, column.label("stored"), actual.label("actual"))
+            .where(column != actual)
+        )
+        drift.extend(
+            {"counter": name, "id": row.id, "stored": row.stored, "actual": row.actual}
+            for row in result
+        )
+    return drift
+
+async def repair_drift(db: AsyncSession) -> List[dict]:
+    """Overwrite drifted counters with recomputed values; returns the drift found."""
+    drift = await find_drift(db)
+    for _, model, column, actual in COUNTERS:
+        await db.execute(
+            update(model).where(column != actual).values({column.key: actual})
+        )
+    return drift
+
+async def run(repair: bool):
+    async with AsyncSessionLocal() as session:
+        if repair:
+            drift = await repair_drift(session)
+            await session.commit()
+        else:
+            drift = await find_drift(session)
+    await engine.dispose()
+
+    for item in drift:
+        print(f"{item['counter']} id={item['id']}: stored {item['stored']}, actual {item['actual']}")
+    action = "repaired" if repair else "found"
+    print(f"{len(drift)} drifted counters {action}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Check maintained counter columns.")
+    parser.add_argument("--repair", action="store_true",
+                        help="overwrite drifted counters with recomputed values")
+    args = parser.parse_args()
+    asyncio.run(run(args.repair))
+
+if __name__ == "__main__":
+    main()
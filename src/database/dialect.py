@@ -0,0 +1,39 @@
+"""Dialect-specific statement helpers."""
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import Date, Table, cast, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+def upsert_insert(db: AsyncSession, table: Table):
+    """Return an INSERT for the session's dialect that supports ON CONFLICT.
+
+    PostgreSQL is the production database; SQLite is supported so the same
+    statements run against local stand-ins.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(table)
+    if dialect == "sqlite":
+        return sqlite.insert(table)
+    raise NotImplementedError(f"ON CONFLICT is not supported for {dialect}")
+
+def month_start(db: AsyncSession, column):
+    """Return a SQL expression truncating a timestamp column to its month's first day."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return cast(func.date_trunc("month", column), Date)
+    if dialect == "sqlite":
+        return func.date(column, "start of month", type_=Date)
+    raise NotImplementedError(f"Month truncation is not supported for {dialect}")
+
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Convert a timestamp to naive UTC for comparison with DateTime columns.
+
+    Timestamps are stored as naive UTC. asyncpg rejects aware values for
+    TIMESTAMP WITHOUT TIME ZONE and SQLite compares them as text, so aware
+    request parameters must be converted; naive ones are taken as UTC.
+    """
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
@@ -0,0 +1,258 @@
+"""Club budget ledger: maintained monthly summaries and the reports built on them.
+
+Every ClubBudget insert goes through record_budget_entry, which adds the
+amount to the matching (club, month, type, category) summary row in the
+same transaction. Amounts are integer cents throughout and are only
+turned into decimal strings at the edge, by format_cents. Balance,
+category and monthly reports read only the summary rows. The rebuild
+command recomputes all summaries from the entries, e.g. after importing
+entries directly into the table.
+
+Usage:
+    python -m src.database.ledger --rebuild
+"""
+import argparse
+import asyncio
+from datetime import date, datetime
+from decimal import Decimal
+from typing import List, Optional
+from sqlalchemy import select, delete, insert, func, case
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import AsyncSessionLocal, engine
+from .dialect import upsert_insert, month_start, naive_utc
+from .models import ClubBudget, ClubBudgetSummary
+
+BUDGET_TYPES = ("income", "expense")
+
+def to_cents(amount: Decimal) -> int:
+    """Convert a decimal amount with at most two places to integer cents."""
+    return int(amount.scaleb(2))
+
+def format_cents(cents: int) -> str:
+    """Format integer cents as an exact decimal string, e.g. 1050 -> "10.50"."""
+    return str(Decimal(cents).scaleb(-2))
+
+async def record_budget_entry(db: AsyncSession, entry: ClubBudget):
+    """Add a new budget entry and fold it into its monthly summary row."""
+    entry.date = entry.date or datetime.utcnow()
+    db.add(entry)
+    table = ClubBudgetSummary.__table__
+    statement = upsert_insert(db, table).values(
+        club_id=entry.club_id,
+        month=date(entry.date.year, entry.date.month, 1),
+        type=entry.type,
+        category=entry.category,
+        total_cents=entry.amount_cents,
+        entry_count=1
+    )
+    await db.execute(
+        statement.on_conflict_do_update(
+            index_elements=["club_id", "month", "type", "category"],
+            set_={
+                "total_cents": table.c.total_cents + statement.excluded.total_cents,
+                "entry_count": table.c.entry_count + 1
+            }
+        )
+    )
+
+def _signed_total():
+    return case(
+        (ClubBudgetSummary.type == "income", ClubBudgetSummary.total_cents),
+        else_=-ClubBudgetSummary.total_cents
+    )
+
+def _type_total(budget_type: str):
+    return func.coalesce(
+        func.sum(ClubBudgetSummary.total_cents).filter(ClubBudgetSummary.type == budget_type), 0
+    )
+
+def _summary_query(club_id: int, since: Optional[date], until: Optional[date]):
+    query = select().select_from(ClubBudgetSummary).where(ClubBudgetSummary.club_id == club_id)
+    if since:
+        query = query.where(ClubBudgetSummary.month >= date(since.year, since.month, 1))
+    if until:
+        query = query.where(ClubBudgetSummary.month <= date(until.year, until.month, 1))
+    return query
+
+async def club_balance(db: AsyncSession, club_id: int) -> dict:
+    """Total income, expense and balance of a club."""
+    result = await db.execute(
+        _summary_query(club_id, None, None).add_columns(
+            _type_total("income").label("income"),
+            _type_total("expense").label("expense"),
+            func.coalesce(func.sum(ClubBudgetSummary.entry_count), 0).label("entry_count")
+        )
+    )
+    row = result.one()
+    return {
+        "club_id": club_id,
+        "income": format_cents(row.income),
+        "expense": format_cents(row.expense),
+        "balance": format_cents(row.income - row.expense),
+        "entry_count": row.entry_count
+    }
+
+async def category_totals(
+    db: AsyncSession,
+    club_id: int,
+    since: Optional[date] = None,
+    until: Optional[date] = None
+) -> List[dict]:
+    """Income and expense per category over an optional month range."""
+    result = await db.execute(
+        _summary_query(club_id, since, until)
+        .add_columns(
+            ClubBudgetSummary.type,
+            ClubBudgetSummary.category,
+            func.sum(ClubBudgetSummary.total_cents).label("total"),
+            func.sum(ClubBudgetSummary.entry_count).label("entry_count")
+        )
+        .group_by(ClubBudgetSummary.type, ClubBudgetSummary.category)
+        .order_by(ClubBudgetSummary.type, ClubBudgetSummary.category)
+    )
+    return [
+        {
+            "type": row.type,
+            "category": row.category,
+            "total": format_cents(row.total),
+            "entry_count": row.entry_count
+        }
+        for row in result
+    ]
+
+async def monthly_rollup(
+    db: AsyncSession,
+    club_id: int,
+    since: Optional[date] = None,
+    until: Optional[date] = None
+) -> List[dict]:
+    """Income, expense and net per month over an optional month range."""
+    result = await db.execute(
+        _summary_query(club_id, since, until)
+        .add_columns(
+            ClubBudgetSummary.month,
+            _type_total("income").label("income"),
+            _type_total("expense").label("expense"),
+            func.sum(_signed_total()).label("net")
+        )
+        .group_by(ClubBudgetSummary.month)
+        .order_by(ClubBudgetSummary.month)
+    )
+    return [
+        {
+            "month": row.month.isoformat(),
+            "income": format_cents(row.income),
+            "expense": format_cents(row.expense),
+            "net": format_cents(row.net)
+        }
+        for row in result
+    ]
+
+# Dimensions accepted by entry_totals
+ENTRY_GROUPS = ("club", "type", "category", "month")
+
+async def entry_totals(
+    db: AsyncSession,
+    since: datetime,
+    until: datetime,
+    group_by: List[str],
+    club_id: Optional[int] = None
+) -> List[dict]:
+    """Sum raw entries in [since, until) grouped by the given dimensions.
+
+    For ranges that do not fall on month boundaries. The aggregation runs
+    entirely in the database, so only one row per group is returned.
+    """
+    since, until = naive_utc(since), naive_utc(until)
+    dimensions = {
+        "club": ClubBudget.club_id,
+        "type": ClubBudget.type,
+        "category": ClubBudget.category,
+        "month": month_start(db, ClubBudget.date)
+    }
+    columns = [dimensions[name].label(name) for name in group_by]
+    query = (
+        select(
+            *columns,
+            func.sum(ClubBudget.amount_cents).label("total"),
+            func.count().label("entry_count")
+        )
+        .where(ClubBudget.date >= since)
+        .where(ClubBudget.date < until)
+        .group_by(*columns)
+        .order_by(*columns)
+    )
+    if club_id is not None:
+        query = query.where(ClubBudget.club_id == club_id)
+
+    result = await db.execute(query)
+    totals = []
+    for row in result:
+        item = {
+            "club_id" if name == "club" else name: getattr(row, name)
+            for name in group_by
+        }
+        if "month" in item:
+            item["month"] = item["month"].isoformat()
+        item["total"] = format_cents(row.total)
+        item["entry_count"] = row.entry_count
+        totals.append(item)
+    return totals
+
+async def club_balances(db: AsyncSession) -> List[dict]:
+    """Income, expense and balance of every club with budget entries."""
+    result = await db.execute(
+        select(
+            ClubBudgetSummary.club_id,
+            _type_total("income").label("income"),
+            _type_total("expense").label("expense")
+        )
+        .group_by(ClubBudgetSummary.club_id)
+        .order_by(ClubBudgetSummary.club_id)
+    )
+    return [
+        {
+            "club_id": row.club_id,
+            "income": format_cents(row.income),
+            "expense": format_cents(row.expense),
+            "balance": format_cents(row.income - row.expense)
+        }
+        for row in result
+    ]
+
+async def rebuild_summaries(db: AsyncSession) -> int:
+    """Recompute every summary row from the entries; returns the row count."""
+    month = month_start(db, ClubBudget.date)
+    await db.execute(delete(ClubBudgetSummary))
+    result = await db.execute(
+        insert(ClubBudgetSummary).from_select(
+            ["club_id", "month", "type", "category", "total_cents", "entry_count"],
+            select(
+                ClubBudget.club_id,
+                month,
+                ClubBudget.type,
+                ClubBudget.category,
+                func.sum(ClubBudget.amount_cents),
+                func.count()
+            ).group_by(ClubBudget.club_id, month, ClubBudget.type, ClubBudget.category)
+        )
+    )
+    return result.rowcount
+
+async def run():
+    async with AsyncSessionLocal() as session:
+        rows = await rebuild_summaries(session)
+        await session.commit()
+    await engine.dispose()
+    print(f"{rows} budget summary rows rebuilt")
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain club budget summaries.")
+    parser.add_argument("--rebuild", action="store_true", required=True,
+                        help="recompute all summary rows from budget entries")
+    parser.parse_args()
+    asyncio.run(run())
+
+if __name__ == "__main__":
+    main()
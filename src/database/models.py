@@ -1,7 +1,7 @@
 """Database models for the application."""
-from datetime import datetime
+from datetime import date, datetime
 from typing import List, Optional
-from sqlalchemy import String, Integer, DateTime, ForeignKey, Table, Column
+from sqlalchemy import String, Integer, BigInteger, Date, DateTime, ForeignKey, Table, Column, CheckConstraint, Index, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .config import Base
@@ -11,7 +11,9 @@ activity_participants = Table(
     'activity_participants',
     Base.metadata,
     Column('activity_id', Integer, ForeignKey('activities.id'), primary_key=True),
-    Column('user_id', Integer, ForeignKey('users.id'), primary_key=True)
+    Column('user_id', Integer, ForeignKey('users.id'), primary_key=True),
+    # A student's activities, for schedule conflict checks
+    Index('ix_activity_participants_user_id', 'user_id')
 )
 
 class User(Base):
@@ -50,12 +52,20 @@ class User(Base):
 class Activity(Base):
     """Activity model for school activities and clubs."""
     __tablename__ = "activities"
+    __table_args__ = (
+        CheckConstraint(
+            "participant_count <= max_participants",
+            name="ck_activities_participant_count"
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String(255), unique=True, index=True)
     description: Mapped[str] = mapped_column(String(1000))
     schedule: Mapped[str] = mapped_column(String(255))
     max_participants: Mapped[int] = mapped_column(Integer)
+    # Maintained by the signup engine so capacity checks never load participants
+    participant_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(
         DateTime, 
@@ -71,6 +81,54 @@ class Activity(Base):
     club_id: Mapped[Optional[int]] = mapped_column(ForeignKey("clubs.id"))
     club: Mapped[Optional["Club"]] = relationship(back_populates="activities")
 
+class WaitlistEntry(Base):
+    """Queued signup for a full activity, ordered by id."""
+    __tablename__ = "activity_waitlist"
+    __table_args__ = (
+        UniqueConstraint("activity_id", "user_id", name="uq_activity_waitlist_activity_user"),
+        Index("ix_activity_waitlist_activity_id_id", "activity_id", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    activity_id: Mapped[int] = mapped_column(ForeignKey("activities.id"))
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    # Relationships
+    activity: Mapped[Activity] = relationship()
+    user: Mapped[User] = relationship()
+
+class ActivityTimeSlot(Base):
+    """Weekly time slot parsed from an activity's schedule."""
+    __tablename__ = "activity_time_slots"
+    __table_args__ = (
+        # Overlap lookups join on activity and weekday, then compare times
+        Index("ix_activity_time_slots_activity_id_weekday_start", "activity_id", "weekday", "start_minute"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    activity_id: Mapped[int] = mapped_column(ForeignKey("activities.id"))
+    weekday: Mapped[int] = mapped_column(Integer)  # 0 = Monday
+    start_minute: Mapped[int] = mapped_column(Integer)  # minutes after midnight
+    end_minute: Mapped[int] = mapped_column(Integer)
+
+    # Relationships
+    activity: Mapped[Activity] = relationship()
+
+# Roles created for every new club
+DEFAULT_CLUB_ROLES = [
+    {
+        "name": "Leader",
+        "description": "Club leader with full permissions",
+        "permissions": "all"
+    },
+    {
+        "name": "Member",
+        "description": "Regular club member",
+        "permissions": "view,participate"
+    }
+]
+
 class ClubRole(Base):
     """Roles within a club."""
     __tablename__ = "club_roles"
@@ -81,6 +139,8 @@ class ClubRole(Base):
     permissions: Mapped[str] = mapped_column(String(1000))  # JSON string of permissions
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     club_id: Mapped[int] = mapped_column(ForeignKey("clubs.id"))
+    # Active members holding this role, maintained with membership changes
+    member_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
 
     # Relationships
     club: Mapped["Club"] = relationship(back_populates="roles")
@@ -89,9 +149,14 @@ class ClubRole(Base):
 class ClubMember(Base):
     """Association model for club memberships with roles."""
     __tablename__ = "club_members"
+    __table_args__ = (
+        UniqueConstraint("club_id", "user_id", name="uq_club_members_club_user"),
+        # Membership existence checks by status read the index alone
+        Index("ix_club_members_club_id_user_id_status", "club_id", "user_id", "status"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
     club_id: Mapped[int] = mapped_column(ForeignKey("clubs.id"))
     role_id: Mapped[int] = mapped_column(ForeignKey("club_roles.id"))
     joined_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
@@ -105,6 +170,11 @@ class ClubMember(Base):
 class Club(Base):
     """Club model for organizing related activities."""
     __tablename__ = "clubs"
+    __table_args__ = (
+        # Keyset pagination of GET /clubs/ with and without a category filter
+        Index("ix_clubs_is_active_id", "is_active", "id"),
+        Index("ix_clubs_category_is_active_id", "category", "is_active", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String(255), unique=True, index=True)
@@ -112,6 +182,10 @@ class Club(Base):
     category: Mapped[str] = mapped_column(String(100))
     max_members: Mapped[Optional[int]] = mapped_column(Integer)
     is_active: Mapped[bool] = mapped_column(default=True)
+    # Members per status, maintained with membership changes
+    active_member_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    pending_member_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    inactive_member_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(
         DateTime, 
@@ -133,10 +207,15 @@ class Club(Base):
 class ClubBudget(Base):
     """Budget tracking for clubs."""
     __tablename__ = "club_budgets"
+    __table_args__ = (
+        # Date range reports per club
+        Index("ix_club_budgets_club_id_date", "club_id", "date"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     club_id: Mapped[int] = mapped_column(ForeignKey("clubs.id"))
-    amount: Mapped[float] = mapped_column()
+    # Exact amount in cents; never stored as a float
+    amount_cents: Mapped[int] = mapped_column(BigInteger)
     description: Mapped[str] = mapped_column(String(1000))
     type: Mapped[str] = mapped_column(String(50))  # income, expense
     category: Mapped[str] = mapped_column(String(100))
@@ -145,4 +224,26 @@ class ClubBudget(Base):
 
     # Relationships
     club: Mapped[Club] = relationship(back_populates="budget_entries")
-    created_by: Mapped[User] = relationship()
\ No newline at end of file
+    created_by: Mapped[User] = relationship()
+
+class ClubBudgetSummary(Base):
+    """Per-club monthly totals of budget entries by type and category.
+
+    Updated in the same transaction as each ClubBudget insert, so ledger
+    reports never have to sum individual entries.
+    """
+    __tablename__ = "club_budget_summaries"
+    __table_args__ = (
+        UniqueConstraint(
+            "club_id", "month", "type", "category",
+            name="uq_club_budget_summaries_club_month_type_category"
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    club_id: Mapped[int] = mapped_column(ForeignKey("clubs.id"))
+    month: Mapped[date] = mapped_column(Date)  # first day of the month
+    type: Mapped[str] = mapped_column(String(50))  # income, expense
+    category: Mapped[str] = mapped_column(String(100))
+    total_cents: Mapped[int] = mapped_column(BigInteger)
+    entry_count: Mapped[int] = mapped_column(Integer, default=0)
@@ -0,0 +1,446 @@
+"""Streaming CSV/NDJSON import for users, clubs and club memberships.
+
+The file is read row by row and processed in chunks, so memory stays flat
+regardless of file size. Each chunk is validated, inserted with one
+multi-row INSERT ... ON CONFLICT DO NOTHING per table and committed on
+its own. User passwords are hashed on a process pool shared by all imports,
+which the application shuts down with its lifespan.
+
+Expected columns:
+    users:       email, password, first_name, last_name, role
+    clubs:       name, description, category, max_members, leader_email
+    memberships: club_name, email, role_name, status
+
+Usage:
+    python -m src.database.roster_import users students.csv
+    python -m src.database.roster_import memberships members.ndjson --format ndjson
+"""
+import argparse
+import asyncio
+import csv
+import json
+import math
+import multiprocessing
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional, Tuple
+from pydantic import EmailStr, TypeAdapter, ValidationError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import AsyncSessionLocal, engine
+from .counters import record_membership_change
+from .dialect import upsert_insert
+from .models import Club, ClubMember, ClubRole, User, DEFAULT_CLUB_ROLES
+
+# Rows validated and inserted per transaction
+CHUNK_SIZE = int(os.getenv("ROSTER_IMPORT_CHUNK_SIZE", "1000"))
+# Processes used for password hashing, shared by all imports (0 means half the CPUs,
+# leaving the rest to request handling and login hashing)
+HASH_WORKERS = int(os.getenv("ROSTER_HASH_WORKERS", "0")) or max(1, (os.cpu_count() or 1) // 2)
+# Workers start from a fresh interpreter rather than a fork of the server,
+# which would copy its event loop, threads and open database connections
+HASH_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+# Per-row errors kept in the report; the rest are only counted
+MAX_REPORTED_ERRORS = 1000
+
+IMPORT_KINDS = ("users", "clubs", "memberships")
+IMPORT_FORMATS = ("csv", "ndjson")
+REQUIRED_COLUMNS = {
+    "users": {"email", "password"},
+    "clubs": {"name", "category"},
+    "memberships": {"club_name", "email", "role_name"}
+}
+USER_ROLES = {"student", "teacher", "admin"}
+MEMBER_STATUSES = {"active", "pending", "inactive"}
+
+_email_adapter = TypeAdapter(EmailStr)
+
+@dataclass
+class ImportReport:
+    """Outcome of an import run."""
+    kind: str
+    rows: int = 0
+    inserted: int = 0
+    error_count: int = 0
+    errors: List[dict] = field(default_factory=list)
+    seconds: float = 0.0
+
+    def add_error(self, line: int, message: str):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": message})
+
+    def as_dict(self) -> dict:
+        return {
+            "kind": self.kind,
+            "rows": self.rows,
+            "inserted": self.inserted,
+            "failed": self.error_count,
+            "seconds": round(self.seconds, 3),
+            "rows_per_second": round(self.rows / self.seconds, 1) if self.seconds else None,
+            "errors": sorted(self.errors, key=lambda error: error["line"])
+        }
+
+def hash_passwords(passwords: List[str]) -> List[str]:
+    """Hash a batch of passwords; runs inside a worker process."""
+    from ..auth.security import get_password_hash
+    return [get_password_hash(password) for password in passwords]
+
+_hash_pool: Optional[ProcessPoolExecutor] = None
+
+def get_hash_pool() -> ProcessPoolExecutor:
+    """The process pool shared by all imports, created on first use."""
+    global _hash_pool
+    if _hash_pool is None:
+        _hash_pool = ProcessPoolExecutor(
+            max_workers=HASH_WORKERS,
+            mp_context=multiprocessing.get_context(HASH_START_METHOD)
+        )
+    return _hash_pool
+
+async def shutdown_hash_pool():
+    """Stop the hashing workers, waiting for them off the event loop."""
+    global _hash_pool
+    pool, _hash_pool = _hash_pool, None
+    if pool is not None:
+        await asyncio.to_thread(pool.shutdown)
+
+def _clean(value: Optional[str]) -> Optional[str]:
+    value = (value or "").strip()
+    return value or None
+
+def _valid_email(value: Optional[str]) -> Optional[str]:
+    try:
+        return _email_adapter.validate_python(value)
+    except ValidationError:
+        return None
+
+def _read_csv(lines: Iterable[str], kind: str) -> Iterator[Tuple[int, dict]]:
+    reader = csv.DictReader(lines)
+    missing = REQUIRED_COLUMNS[kind] - set(reader.fieldnames or ())
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(sorted(missing))}")
+    for row in reader:
+        yield reader.line_num, row
+
+def _read_ndjson(lines: Iterable[str], report: ImportReport) -> Iterator[Tuple[int, dict]]:
+    for line_num, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as exc:
+            error = f"Invalid JSON: {exc.msg}"
+        else:
+            if isinstance(row, dict):
+                yield line_num, row
+                continue
+            error = "Expected a JSON object"
+        # Malformed lines are reported and skipped, not fatal
+        report.rows += 1
+        report.add_error(line_num, error)
+
+def _read_chunks(
+    lines: Iterable[str],
+    kind: str,
+    fmt: str,
+    chunk_size: int,
+    report: ImportReport
+) -> Iterator[List[Tuple[int, dict]]]:
+    """Yield (line number, row) chunks from text lines without reading them all."""
+    rows = _read_csv(lines, kind) if fmt == "csv" else _read_ndjson(lines, report)
+    chunk = []
+    for line_num, row in rows:
+        # NDJSON values may be numbers; normalise everything to text like CSV
+        row = {key: None if value is None else str(value) for key, value in row.items()}
+        chunk.append((line_num, row))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+async def _import_users(db: AsyncSession, chunk, report: ImportReport):
+    rows = []
+    seen = set()
+    for line, row in chunk:
+        email = _valid_email(_clean(row.get("email")))
+        role = _clean(row.get("role")) or "student"
+        if email is None:
+            report.add_error(line, "Invalid email")
+        elif not row.get("password"):
+            report.add_error(line, "Missing password")
+        elif email in seen:
+            report.add_error(line, "Duplicate email in file")
+        elif role not in USER_ROLES:
+            report.add_error(line, f"Unknown role {role}")
+        else:
+            seen.add(email)
+            rows.append((line, {
+                "email": email,
+                "password": row["password"],
+                "first_name": _clean(row.get("first_name")),
+                "last_name": _clean(row.get("last_name")),
+                "role": role
+            }))
+    if not rows:
+        return
+
+    # Hash passwords on the process pool, split evenly across workers
+    to_hash = [user.pop("password") for _, user in rows]
+    batch = math.ceil(len(to_hash) / HASH_WORKERS)
+    loop = asyncio.get_running_loop()
+    pool = get_hash_pool()
+    hashed_batches = await asyncio.gather(*[
+        loop.run_in_executor(pool, hash_passwords, to_hash[start:start + batch])
+        for start in range(0, len(to_hash), batch)
+    ])
+    hashes = [value for hashed in hashed_batches for value in hashed]
+
+    now = datetime.utcnow()
+    values = [
+        {
+            **user,
+            "hashed_password": hashed,
+            "is_active": True,
+            "created_at": now,
+            "updated_at": now
+        }
+        for (_, user), hashed in zip(rows, hashes)
+    ]
+    result = await db.execute(
+        upsert_insert(db, User.__table__)
+        .values(values)
+        .on_conflict_do_nothing(index_elements=["email"])
+        .returning(User.email)
+    )
+    inserted = set(result.scalars())
+    report.inserted += len(inserted)
+    for line, user in rows:
+        if user["email"] not in inserted:
+            report.add_error(line, "Email already registered")
+
+async def _import_clubs(db: AsyncSession, chunk, report: ImportReport):
+    leader_emails = {_clean(row.get("leader_email")) for _, row in chunk} - {None}
+    result = await db.execute(
+        select(User.email, User.id).where(User.email.in_(leader_emails))
+    )
+    leaders = dict(result.all())
+
+    rows = []
+    seen = set()
+    now = datetime.utcnow()
+    for line, row in chunk:
+        name = _clean(row.get("name"))
+        leader_email = _clean(row.get("leader_email"))
+        max_members = _clean(row.get("max_members"))
+        if name is None:
+            report.add_error(line, "Missing club name")
+        elif name in seen:
+            report.add_error(line, "Duplicate club name in file")
+        elif leader_email and leader_email not in leaders:
+            report.add_error(line, f"Leader {leader_email} not found")
+        elif max_members and not max_members.isdigit():
+            report.add_error(line, "max_members must be a whole number")
+        else:
+            seen.add(name)
+            leader_id = leaders.get(leader_email)
+            rows.append((line, {
+                "name": name,
+                "description": _clean(row.get("description")) or "",
+                "category": _clean(row.get("category")),
+                "max_members": int(max_members) if max_members else None,
+                "leader_id": leader_id,
+                "is_active": True,
+                "active_member_count": 1 if leader_id else 0,
+                "pending_member_count": 0,
+                "inactive_member_count": 0,
+                "created_at": now,
+                "updated_at": now
+            }))
+    if not rows:
+        return
+
+    result = await db.execute(
+        upsert_insert(db, Club.__table__)
+        .values([values for _, values in rows])
+        .on_conflict_do_nothing(index_elements=["name"])
+        .returning(Club.id, Club.name, Club.leader_id)
+    )
+    created = {row.name: row for row in result}
+    report.inserted += len(created)
+    for line, values in rows:
+        if values["name"] not in created:
+            report.add_error(line, "Club already exists")
+    if not created:
+        return
+
+    # Default roles, with the leader already counted in the Leader role
+    result = await db.execute(
+        upsert_insert(db, ClubRole.__table__)
+        .values([
+            {
+                **role,
+                "club_id": club.id,
+                "member_count": 1 if club.leader_id and role["name"] == "Leader" else 0,
+                "created_at": now
+            }
+            for club in created.values()
+            for role in DEFAULT_CLUB_ROLES
+        ])
+        .returning(ClubRole.id, ClubRole.club_id, ClubRole.name)
+    )
+    leader_roles = {row.club_id: row.id for row in result if row.name == "Leader"}
+    leader_members = [
+        {
+            "user_id": club.leader_id,
+            "club_id": club.id,
+            "role_id": leader_roles[club.id],
+            "status": "active",
+            "joined_at": now
+        }
+        for club in created.values() if club.leader_id
+    ]
+    if leader_members:
+        await db.execute(upsert_insert(db, ClubMember.__table__).values(leader_members))
+
+async def _import_memberships(db: AsyncSession, chunk, report: ImportReport):
+    club_names = {_clean(row.get("club_name")) for _, row in chunk} - {None}
+    emails = {_clean(row.get("email")) for _, row in chunk} - {None}
+    role_names = {_clean(row.get("role_name")) for _, row in chunk} - {None}
+
+    # Lock the clubs so capacity is shared correctly with concurrent writers
+    result = await db.execute(
+        select(Club.name, Club.id, Club.is_active, Club.max_members, Club.active_member_count)
+        .where(Club.name.in_(club_names))
+        .order_by(Club.id)
+        .with_for_update()
+    )
+    clubs = {row.name: row for row in result}
+    result = await db.execute(select(User.email, User.id).where(User.email.in_(emails)))
+    users = dict(result.all())
+    result = await db.execute(
+        select(ClubRole.club_id, ClubRole.name, ClubRole.id)
+        .where(ClubRole.club_id.in_([club.id for club in clubs.values()]))
+        .where(ClubRole.name.in_(role_names))
+    )
+    roles = {(row.club_id, row.name): row.id for row in result}
+
+    seats = {
+        club.id: club.max_members - club.active_member_count
+        for club in clubs.values() if club.max_members is not None
+    }
+    rows = []
+    seen = set()
+    now = datetime.utcnow()
+    for line, row in chunk:
+        club = clubs.get(_clean(row.get("club_name")))
+        user_id = users.get(_clean(row.get("email")))
+        status = _clean(row.get("status")) or "active"
+        role_id = roles.get((club.id, _clean(row.get("role_name")))) if club else None
+        if club is None or not club.is_active:
+            report.add_error(line, "Club not found")
+        elif user_id is None:
+            report.add_error(line, "User not found")
+        elif role_id is None:
+            report.add_error(line, "Role not found")
+        elif status not in MEMBER_STATUSES:
+            report.add_error(line, f"Unknown status {status}")
+        elif (club.id, user_id) in seen:
+            report.add_error(line, "Duplicate membership in file")
+        elif status == "active" and seats.get(club.id, 1) <= 0:
+            report.add_error(line, "Club is at maximum capacity")
+        else:
+            seen.add((club.id, user_id))
+            if status == "active" and club.id in seats:
+                seats[club.id] -= 1
+            rows.append((line, {
+                "user_id": user_id,
+                "club_id": club.id,
+                "role_id": role_id,
+                "status": status,
+                "joined_at": now
+            }))
+    if not rows:
+        return
+
+    result = await db.execute(
+        upsert_insert(db, ClubMember.__table__)
+        .values([values for _, values in rows])
+        .on_conflict_do_nothing(index_elements=["club_id", "user_id"])
+        .returning(ClubMember.club_id, ClubMember.user_id, ClubMember.role_id, ClubMember.status)
+    )
+    inserted = result.all()
+    report.inserted += len(inserted)
+    added = {(row.club_id, row.user_id) for row in inserted}
+    for line, values in rows:
+        if (values["club_id"], values["user_id"]) not in added:
+            report.add_error(line, "User is already a member of this club")
+
+    # One counter update per (club, role, status)
+    changes = Counter((row.club_id, row.role_id, row.status) for row in inserted)
+    for (club_id, role_id, status), count in changes.items():
+        await record_membership_change(db, club_id, role_id, None, status, count)
+
+async def import_roster(
+    kind: str,
+    lines: Iterable[str],
+    fmt: str = "csv",
+    session_factory=AsyncSessionLocal,
+    chunk_size: int = CHUNK_SIZE
+) -> ImportReport:
+    """Import text lines of the given kind and format, committing chunk by chunk."""
+    if kind not in IMPORT_KINDS:
+        raise ValueError(f"Unknown import kind {kind}")
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f"Unknown import format {fmt}")
+
+    report = ImportReport(kind=kind)
+    started = time.perf_counter()
+    for chunk in _read_chunks(lines, kind, fmt, chunk_size, report):
+        report.rows += len(chunk)
+        async with session_factory() as db:
+            if kind == "users":
+                await _import_users(db, chunk, report)
+            elif kind == "clubs":
+                await _import_clubs(db, chunk, report)
+            else:
+                await _import_memberships(db, chunk, report)
+            await db.commit()
+    report.seconds = time.perf_counter() - started
+    return report
+
+async def run(kind: str, path: str, fmt: str, chunk_size: int):
+    with open(path, newline="", encoding="utf-8-sig") as import_file:
+        report = await import_roster(kind, import_file, fmt, chunk_size=chunk_size)
+    await shutdown_hash_pool()
+    await engine.dispose()
+
+    summary = report.as_dict()
+    for error in summary.pop("errors"):
+        print(f"line {error['line']}: {error['error']}")
+    print(
+        f"{summary['rows']} rows, {summary['inserted']} inserted, "
+        f"{summary['failed']} failed in {summary['seconds']}s "
+        f"({summary['rows_per_second']} rows/s)"
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="Import users, clubs or memberships from CSV or NDJSON.")
+    parser.add_argument("kind", choices=IMPORT_KINDS)
+    parser.add_argument("path", help="CSV file with a header row, or NDJSON file")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, default=None,
+                        help="file format (default: from the file extension)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE,
+                        help="rows inserted per transaction")
+    args = parser.parse_args()
+    fmt = args.format or ("ndjson" if args.path.endswith((".ndjson", ".jsonl")) else "csv")
+    asyncio.run(run(args.kind, args.path, fmt, args.chunk_size))
+
+if __name__ == "__main__":
+    main()
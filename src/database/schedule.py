@@ -0,0 +1,152 @@
+"""Structured activity schedules and conflict detection.
+
+Activity.schedule stays free text for display, e.g.
+"Tuesdays and Thursdays, 3:30 PM - 4:30 PM". parse_schedule turns it into
+(weekday, start, end) slots stored in activity_time_slots, which signup
+uses to find overlaps with a student's other activities through indexed
+lookups instead of comparing schedule strings.
+
+The slots are rewritten by an ORM event whenever an activity is inserted
+or its schedule changes. Activities written with Core statements or
+directly in the database need the rebuild command. Schedules that cannot
+be parsed are logged and get no slots, so they never conflict.
+
+Usage:
+    python -m src.database.schedule --rebuild
+"""
+import argparse
+import asyncio
+import logging
+import os
+import re
+from typing import List, NamedTuple
+from sqlalchemy import select, and_, delete, event, insert, inspect
+from sqlalchemy.orm import aliased
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import AsyncSessionLocal, engine
+from .models import Activity, ActivityTimeSlot, activity_participants
+
+logger = logging.getLogger(__name__)
+
+# "reject" refuses conflicting signups with 409, "warn" allows them and reports the conflicts
+SCHEDULE_CONFLICT_MODE = os.getenv("SCHEDULE_CONFLICT_MODE", "reject")
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+_TIME = r"\d{1,2}(?::\d{2})?\s*[AP]M"
+_SEGMENT = re.compile(
+    rf"^(?P<days>.+?),?\s+(?P<start>{_TIME})\s*[-–]\s*(?P<end>{_TIME})$",
+    re.IGNORECASE
+)
+_DAY_SEPARATOR = re.compile(r"\s*,\s*(?:and\s+)?|\s+and\s+|\s*&\s*", re.IGNORECASE)
+
+class TimeSlot(NamedTuple):
+    """A weekly interval; minutes are counted from midnight."""
+    weekday: int
+    start_minute: int
+    end_minute: int
+
+def _parse_weekday(token: str) -> int:
+    name = token.strip().lower().rstrip(".")
+    if name.endswith("s") and name[:-1] in WEEKDAYS:
+        name = name[:-1]
+    for index, weekday in enumerate(WEEKDAYS):
+        if len(name) >= 3 and weekday.startswith(name):
+            return index
+    raise ValueError(f"Unknown weekday {token!r}")
+
+def _parse_time(value: str) -> int:
+    match = re.match(r"^(\d{1,2})(?::(\d{2}))?\s*([AP]M)$", value.strip(), re.IGNORECASE)
+    hour, minute = int(match.group(1)), int(match.group(2) or 0)
+    if not 1 <= hour <= 12 or minute > 59:
+        raise ValueError(f"Invalid time {value!r}")
+    return (hour % 12 + (12 if match.group(3).upper() == "PM" else 0)) * 60 + minute
+
+def parse_schedule(schedule: str) -> List[TimeSlot]:
+    """Parse a schedule such as "Mondays, Wednesdays, Fridays, 2:00 PM - 3:00 PM".
+
+    Several day/time segments can be separated by semicolons. Raises
+    ValueError if the text cannot be parsed.
+    """
+    slots = []
+    for segment in schedule.split(";"):
+        match = _SEGMENT.match(segment.strip())
+        if not match:
+            raise ValueError(f"Unrecognized schedule {segment.strip()!r}")
+        start = _parse_time(match.group("start"))
+        end = _parse_time(match.group("end"))
+        if end <= start:
+            raise ValueError(f"Schedule ends before it starts: {segment.strip()!r}")
+        for token in _DAY_SEPARATOR.split(match.group("days")):
+            if token:
+                slot = TimeSlot(_parse_weekday(token), start, end)
+                if slot not in slots:
+                    slots.append(slot)
+    return slots
+
+def _slot_rows(activity_id: int, schedule: str) -> List[dict]:
+    """activity_time_slots rows for a schedule; none if it cannot be parsed."""
+    try:
+        slots = parse_schedule(schedule or "")
+    except ValueError as e:
+        logger.warning("No time slots for activity %s: %s", activity_id, e)
+        return []
+    return [{"activity_id": activity_id, **slot._asdict()} for slot in slots]
+
+@event.listens_for(Activity, "after_insert")
+@event.listens_for(Activity, "after_update")
+def _sync_time_slots(mapper, connection, target):
+    if not inspect(target).attrs.schedule.history.has_changes():
+        return
+    connection.execute(delete(ActivityTimeSlot).where(ActivityTimeSlot.activity_id == target.id))
+    rows = _slot_rows(target.id, target.schedule)
+    if rows:
+        connection.execute(insert(ActivityTimeSlot), rows)
+
+async def rebuild_time_slots(db: AsyncSession) -> int:
+    """Re-parse every activity's schedule into time slots; returns the slot count."""
+    await db.execute(delete(ActivityTimeSlot))
+    result = await db.execute(select(Activity.id, Activity.schedule))
+    rows = [row for activity in result for row in _slot_rows(activity.id, activity.schedule)]
+    if rows:
+        await db.execute(insert(ActivityTimeSlot), rows)
+    return len(rows)
+
+async def schedule_conflicts(db: AsyncSession, activity_id: int, user_id: int) -> List[str]:
+    """Names of the user's activities that overlap the given activity's slots."""
+    requested = aliased(ActivityTimeSlot)
+    taken = aliased(ActivityTimeSlot)
+    result = await db.execute(
+        select(Activity.name)
+        .distinct()
+        .join(activity_participants, activity_participants.c.activity_id == Activity.id)
+        .join(taken, taken.activity_id == Activity.id)
+        .join(requested, and_(
+            requested.weekday == taken.weekday,
+            requested.start_minute < taken.end_minute,
+            requested.end_minute > taken.start_minute
+        ))
+        .where(activity_participants.c.user_id == user_id)
+        .where(requested.activity_id == activity_id)
+        .where(Activity.id != activity_id)
+        .order_by(Activity.name)
+    )
+    return list(result.scalars())
+
+async def run():
+    async with AsyncSessionLocal() as session:
+        slots = await rebuild_time_slots(session)
+        await session.commit()
+    await engine.dispose()
+    print(f"{slots} activity time slots rebuilt")
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain activity time slots.")
+    parser.add_argument("--rebuild", action="store_true", required=True,
+                        help="re-parse all activity schedules into time slots")
+    parser.parse_args()
+    asyncio.run(run())
+
+if __name__ == "__main__":
+    main()
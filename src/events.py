@@ -0,0 +1,83 @@
+"""In-process pub/sub for live seat availability.
+
+Signup and unregister handlers publish an activity's remaining seats after
+they commit; every subscriber (one per Server-Sent Events connection)
+receives them. Subscribers keep only the latest value per activity until
+their connection picks it up, so a slow or idle client costs at most one
+entry per activity and never holds up publishers.
+
+Events only reach clients connected to the same worker process.
+"""
+import asyncio
+import os
+from typing import Dict, Optional, Set
+
+# Open stream connections accepted per worker
+SSE_MAX_CONNECTIONS = int(os.getenv("SSE_MAX_CONNECTIONS", "10000"))
+# Seconds between keep-alive comments on idle streams
+SSE_HEARTBEAT_INTERVAL = float(os.getenv("SSE_HEARTBEAT_INTERVAL", "15"))
+
+class SeatSubscription:
+    """Pending seat counts for one connection, coalesced per activity."""
+
+    __slots__ = ("pending", "_ready")
+
+    def __init__(self):
+        self.pending: Dict[str, int] = {}
+        self._ready = asyncio.Event()
+
+    def push(self, activity: str, seats_remaining: int):
+        self.pending[activity] = seats_remaining
+        self._ready.set()
+
+    async def next_batch(self, timeout: float) -> Optional[Dict[str, int]]:
+        """Wait for changes and take them all; None if the timeout passes first."""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        self._ready.clear()
+        batch, self.pending = self.pending, {}
+        return batch
+
+class SeatEventBroker:
+    """Fan-out of seat count changes to subscribed connections."""
+
+    def __init__(self, max_subscribers: int):
+        self.max_subscribers = max_subscribers
+        self._subscribers: Set[SeatSubscription] = set()
+        self.published = 0
+        self.rejected = 0
+
+    @property
+    def full(self) -> bool:
+        return len(self._subscribers) >= self.max_subscribers
+
+    def subscribe(self) -> Optional[SeatSubscription]:
+        """Register a connection; returns None when the worker is at capacity."""
+        if self.full:
+            self.rejected += 1
+            return None
+        subscription = SeatSubscription()
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: SeatSubscription):
+        self._subscribers.discard(subscription)
+
+    def publish(self, activity: str, seats_remaining: int):
+        """Send an activity's committed seat count to every subscriber."""
+        self.published += 1
+        for subscription in self._subscribers:
+            subscription.push(activity, seats_remaining)
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self._subscribers),
+            "max_subscribers": self.max_subscribers,
+            "published": self.published,
+            "rejected": self.rejected,
+            "pending": sum(len(subscription.pending) for subscription in self._subscribers)
+        }
+
+seat_events = SeatEventBroker(SSE_MAX_CONNECTIONS)
@@ -0,0 +1,59 @@
+"""Streaming CSV and NDJSON exports of query results.
+
+Rows are read from a server-side cursor EXPORT_BATCH_SIZE at a time and
+each batch is encoded and sent before the next is read, so memory use does
+not grow with the size of the export.
+"""
+import csv
+import io
+import json
+from typing import Callable, Optional, Sequence
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+from .database.config import AsyncSessionLocal
+
+# Rows fetched per round trip when exporting
+EXPORT_BATCH_SIZE = 2000
+EXPORT_FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+def stream_export(
+    query,
+    columns: Sequence[str],
+    format: str,
+    filename: Optional[str] = None,
+    serialize: Optional[Callable[..., dict]] = None
+) -> StreamingResponse:
+    """Stream the rows of a select as CSV or NDJSON.
+
+    `columns` names the CSV header and the NDJSON keys; `serialize` can
+    replace the default row-to-dict mapping for NDJSON. With a filename the
+    response is sent as an attachment.
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="Unknown export format")
+    if serialize is None:
+        serialize = lambda row: dict(zip(columns, row))
+
+    def encode(rows) -> str:
+        if format == "ndjson":
+            return "".join(json.dumps(serialize(row), default=str) + "\n" for row in rows)
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue()
+
+    async def generate():
+        if format == "csv":
+            yield encode([columns])
+        # The session lives as long as the stream, not the request handler
+        async with AsyncSessionLocal() as session:
+            result = await session.stream(
+                query.execution_options(yield_per=EXPORT_BATCH_SIZE)
+            )
+            async for partition in result.partitions():
+                yield encode(partition)
+
+    headers = {}
+    if filename:
+        headers["Content-Disposition"] = f'attachment; filename="{filename}.{format}"'
+    return StreamingResponse(generate(), media_type=EXPORT_FORMATS[format], headers=headers)
@@ -0,0 +1,37 @@
+"""JSON serialization for API responses.
+
+orjson is an optional dependency. Set JSON_SERIALIZER=orjson to serialize
+responses with it when it is installed; otherwise the standard library
+encoder is used. Both produce compact JSON.
+"""
+import json
+import os
+from typing import Any
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+# "orjson" opts in to the faster encoder, anything else keeps the default
+JSON_SERIALIZER = os.getenv("JSON_SERIALIZER", "default")
+USE_ORJSON = JSON_SERIALIZER == "orjson" and orjson is not None
+
+def dumps(content: Any) -> bytes:
+    """Serialize content to compact JSON bytes with the configured encoder."""
+    if USE_ORJSON:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+        default=str
+    ).encode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with the configured encoder."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,117 @@
+"""Administrative import, export and reporting endpoints."""
+import io
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database.config import get_read_db
+from ..database.ledger import ENTRY_GROUPS, entry_totals, club_balances
+from ..database.models import Activity, Club, ClubMember, ClubRole, User, activity_participants
+from ..database.roster_import import IMPORT_FORMATS, IMPORT_KINDS, import_roster
+from ..auth.security import check_permission
+from ..auth.permissions import invalidate_club_permissions
+from ..exports import stream_export
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+@router.post("/import/{kind}")
+async def import_records(
+    kind: str,
+    file: UploadFile = File(...),
+    format: str = Query("csv"),
+    current_user: User = Depends(check_permission(["admin"]))
+):
+    """Import users, clubs or memberships from an uploaded CSV or NDJSON file."""
+    if kind not in IMPORT_KINDS:
+        raise HTTPException(status_code=404, detail="Unknown import kind")
+    if format not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="Unknown import format")
+
+    # Decode the spooled upload lazily so large files are never held as one string
+    lines = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        report = await import_roster(kind, lines, format)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        lines.detach()
+
+    if report.inserted and kind != "users":
+        invalidate_club_permissions()
+    return report.as_dict()
+
+@router.get("/export/participants")
+async def export_participants(
+    activity: Optional[str] = None,
+    format: str = Query("csv"),
+    current_user: User = Depends(check_permission(["admin"]))
+):
+    """Stream activity participants, optionally for a single activity."""
+    query = (
+        select(Activity.name, User.email, User.first_name, User.last_name)
+        .join(activity_participants, activity_participants.c.activity_id == Activity.id)
+        .join(User, User.id == activity_participants.c.user_id)
+        .order_by(Activity.id, User.id)
+    )
+    if activity:
+        query = query.where(Activity.name == activity)
+    columns = ["activity", "email", "first_name", "last_name"]
+    return stream_export(query, columns, format, "participants")
+
+@router.get("/export/members")
+async def export_members(
+    club_id: Optional[int] = None,
+    status: Optional[str] = None,
+    format: str = Query("csv"),
+    current_user: User = Depends(check_permission(["admin"]))
+):
+    """Stream club rosters, optionally for a single club or status."""
+    query = (
+        select(
+            Club.name,
+            User.email,
+            User.first_name,
+            User.last_name,
+            ClubRole.name,
+            ClubMember.status,
+            ClubMember.joined_at
+        )
+        .join(Club, Club.id == ClubMember.club_id)
+        .join(User, User.id == ClubMember.user_id)
+        .join(ClubRole, ClubRole.id == ClubMember.role_id)
+        .order_by(ClubMember.club_id, ClubMember.id)
+    )
+    if club_id is not None:
+        query = query.where(ClubMember.club_id == club_id)
+    if status:
+        query = query.where(ClubMember.status == status)
+    columns = ["club", "email", "first_name", "last_name", "role", "status", "joined_at"]
+    return stream_export(query, columns, format, "members")
+
+@router.get("/reports/budget")
+async def budget_report(
+    since: datetime,
+    until: datetime,
+    group_by: str = "club,type",
+    club_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(check_permission(["admin"]))
+):
+    """Total budget entries in [since, until), grouped by club, type, category or month."""
+    groups = list(dict.fromkeys(name.strip() for name in group_by.split(",") if name.strip()))
+    if not groups or any(name not in ENTRY_GROUPS for name in groups):
+        raise HTTPException(
+            status_code=400,
+            detail=f"group_by must be a list of: {', '.join(ENTRY_GROUPS)}"
+        )
+    return await entry_totals(db, since, until, groups, club_id)
+
+@router.get("/reports/balances")
+async def budget_balances(
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(check_permission(["admin"]))
+):
+    """Income, expense and balance of every club."""
+    return await club_balances(db)
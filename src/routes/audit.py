@@ -0,0 +1,128 @@
+"""Audit log query API endpoints."""
+import base64
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database.config import get_read_db
+from ..database.audit import AuditLog
+from ..database.dialect import naive_utc
+from ..database.models import User
+from ..auth.security import check_permission
+from ..exports import stream_export
+
+router = APIRouter(prefix="/audit", tags=["audit"])
+
+# Page size limits for GET /audit
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+def encode_cursor(timestamp: datetime, entry_id: int) -> str:
+    """Encode a (timestamp, id) keyset position as an opaque cursor."""
+    raw = f"{timestamp.isoformat()}|{entry_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Decode a cursor produced by encode_cursor."""
+    try:
+        timestamp, entry_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(timestamp), int(entry_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def serialize_entry(row) -> dict:
+    return {
+        "id": row.id,
+        "timestamp": row.timestamp.isoformat(),
+        "actor_id": row.actor_id,
+        "action": row.action,
+        "entity_type": row.entity_type,
+        "entity_id": row.entity_id,
+        "details": row.details,
+        "ip_address": row.ip_address
+    }
+
+def build_audit_query(
+    actor_id: Optional[int],
+    action: Optional[str],
+    entity_type: Optional[str],
+    entity_id: Optional[int],
+    since: Optional[datetime],
+    until: Optional[datetime]
+):
+    """Select audit columns with the given filters applied."""
+    query = select(
+        AuditLog.id,
+        AuditLog.timestamp,
+        AuditLog.actor_id,
+        AuditLog.action,
+        AuditLog.entity_type,
+        AuditLog.entity_id,
+        AuditLog.details,
+        AuditLog.ip_address
+    )
+    if actor_id is not None:
+        query = query.where(AuditLog.actor_id == actor_id)
+    if action:
+        query = query.where(AuditLog.action == action)
+    if entity_type:
+        query = query.where(AuditLog.entity_type == entity_type)
+    if entity_id is not None:
+        query = query.where(AuditLog.entity_id == entity_id)
+    if since:
+        query = query.where(AuditLog.timestamp >= naive_utc(since))
+    if until:
+        query = query.where(AuditLog.timestamp < naive_utc(until))
+    return query
+
+@router.get("/")
+async def list_audit_entries(
+    actor_id: Optional[int] = None,
+    action: Optional[str] = None,
+    entity_type: Optional[str] = None,
+    entity_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(check_permission(["admin"]))
+):
+    """List audit entries, newest first, using keyset pagination."""
+    query = build_audit_query(actor_id, action, entity_type, entity_id, since, until)
+    if cursor:
+        query = query.where(
+            tuple_(AuditLog.timestamp, AuditLog.id) < tuple_(*decode_cursor(cursor))
+        )
+    query = query.order_by(AuditLog.timestamp.desc(), AuditLog.id.desc()).limit(limit + 1)
+
+    result = await db.execute(query)
+    rows = result.all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    return {
+        "items": [serialize_entry(row) for row in rows],
+        "next_cursor": (
+            encode_cursor(rows[-1].timestamp, rows[-1].id) if has_more else None
+        )
+    }
+
+@router.get("/export")
+async def export_audit_entries(
+    actor_id: Optional[int] = None,
+    action: Optional[str] = None,
+    entity_type: Optional[str] = None,
+    entity_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    current_user: User = Depends(check_permission(["admin"]))
+):
+    """Stream matching audit entries as NDJSON, oldest first."""
+    query = build_audit_query(
+        actor_id, action, entity_type, entity_id, since, until
+    ).order_by(AuditLog.timestamp, AuditLog.id)
+
+    return stream_export(query, query.selected_columns.keys(), "ndjson", serialize=serialize_entry)
@@ -10,8 +10,8 @@ from pydantic import BaseModel, EmailStr
 from ..database.config import get_db
 from ..database.models import User
 from ..auth.security import (
-    get_password_hash,
-    verify_password,
+    get_password_hash_async,
+    verify_password_async,
     create_access_token,
     ACCESS_TOKEN_EXPIRE_MINUTES,
     check_permission
@@ -41,8 +41,10 @@ async def login(
         select(User).where(User.email == form_data.username)
     )
     user = result.scalar_one_or_none()
+    # Return the connection to the pool while bcrypt runs
+    await db.commit()
     
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=401,
             detail="Incorrect email or password",
@@ -89,10 +91,14 @@ async def register_user(
             detail="Only admins can create non-student accounts"
         )
     
+    # Hash without holding a connection; the insert checks one out again
+    await db.commit()
+    hashed_password = await get_password_hash_async(user.password)
+    
     # Create user
     new_user = User(
         email=user.email,
-        hashed_password=get_password_hash(user.password),
+        hashed_password=hashed_password,
         first_name=user.first_name,
         last_name=user.last_name,
         role=user.role
@@ -1,19 +1,52 @@
 """Club management API endpoints."""
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Request
-from sqlalchemy import select
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import select, update, exists
+from sqlalchemy.orm import aliased
 from sqlalchemy.ext.asyncio import AsyncSession
-from pydantic import BaseModel, EmailStr
-from datetime import datetime
+from pydantic import BaseModel, EmailStr, Field
+from datetime import date, datetime
+from decimal import Decimal
+from collections import Counter
 
 from ..auth.audit import audit_log_middleware
 
-from ..database.config import get_db
-from ..database.models import Club, User, ClubMember, ClubRole, ClubBudget
+from ..database.config import get_db, get_read_db, remember_write
+from ..database.models import Club, User, ClubMember, ClubRole, ClubBudget, DEFAULT_CLUB_ROLES
+from ..database.activities import catalog_cache, summarize_bulk_results
+from ..database.counters import claim_member_slot, record_membership_change
+from ..database.dialect import upsert_insert
+from ..database.ledger import (
+    record_budget_entry,
+    club_balance,
+    category_totals,
+    monthly_rollup,
+    to_cents
+)
 from ..auth.security import get_current_user, check_permission
+from ..auth.permissions import ClubPermission, require_club_permission, invalidate_club_permissions
 
 router = APIRouter(prefix="/clubs", tags=["clubs"])
 
+# Page size limits for GET /clubs/
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+# Maximum members accepted by the bulk member endpoint
+MAX_ROSTER_SIZE = 1000
+
+# Fields that can be requested with GET /clubs/?fields=
+CLUB_FIELDS = [
+    "id",
+    "name",
+    "description",
+    "category",
+    "max_members",
+    "member_count",
+    "pending_member_count",
+    "leader"
+]
+
 # Pydantic models for request/response
 class ClubBase(BaseModel):
     name: str
@@ -31,10 +64,14 @@ class ClubMemberAdd(BaseModel):
     email: EmailStr
     role_name: str
 
+class ClubRoster(BaseModel):
+    members: List[ClubMemberAdd] = Field(..., min_length=1, max_length=MAX_ROSTER_SIZE)
+
 class BudgetEntry(BaseModel):
-    amount: float
+    # The sign comes from `type`, so amounts are always positive
+    amount: Decimal = Field(..., gt=0, max_digits=12, decimal_places=2)
     description: str
-    type: str
+    type: Literal["income", "expense"]
     category: str
 
 # API endpoints
@@ -43,6 +80,7 @@ class BudgetEntry(BaseModel):
 async def create_club(
     club: ClubCreate,
     request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(check_permission(["admin", "teacher"]))
 ):
@@ -59,20 +97,7 @@ async def create_club(
     await db.refresh(new_club)
 
     # Create default club roles
-    default_roles = [
-        {
-            "name": "Leader",
-            "description": "Club leader with full permissions",
-            "permissions": "all"
-        },
-        {
-            "name": "Member",
-            "description": "Regular club member",
-            "permissions": "view,participate"
-        }
-    ]
-
-    for role_data in default_roles:
+    for role_data in DEFAULT_CLUB_ROLES:
         role = ClubRole(
             name=role_data["name"],
             description=role_data["description"],
@@ -95,103 +120,275 @@ async def create_club(
         status="active"
     )
     db.add(member)
+    await record_membership_change(db, new_club.id, leader_role.id, None, "active")
     await db.commit()
+    catalog_cache.invalidate()
+    remember_write(response)
 
     return {"message": "Club created successfully", "id": new_club.id}
 
 @router.get("/", response_model=List[dict])
 async def list_clubs(
+    response: Response,
     category: Optional[str] = None,
     is_active: bool = True,
-    db: AsyncSession = Depends(get_db)
+    cursor: Optional[int] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """List all clubs with optional filtering."""
-    query = select(Club).where(Club.is_active == is_active)
+    """List clubs with optional filtering, a page at a time.
+
+    Clubs are ordered by id; pass the X-Next-Cursor response header back
+    as `cursor` for the next page. `fields` is a comma-separated subset of
+    the club fields to return.
+    """
+    selected = CLUB_FIELDS
+    if fields:
+        selected = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = set(selected) - set(CLUB_FIELDS)
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+            )
+
+    leader = aliased(User)
+    columns = [
+        Club.id,
+        Club.name,
+        Club.description,
+        Club.category,
+        Club.max_members,
+        Club.active_member_count,
+        Club.pending_member_count
+    ]
+    query = select(*columns).where(Club.is_active == is_active)
+    if "leader" in selected:
+        query = query.add_columns(
+            leader.id.label("leader_id"),
+            leader.email.label("leader_email"),
+            leader.first_name.label("leader_first_name"),
+            leader.last_name.label("leader_last_name")
+        ).outerjoin(leader, leader.id == Club.leader_id)
     if category:
         query = query.where(Club.category == category)
-    
+    if cursor is not None:
+        query = query.where(Club.id > cursor)
+    query = query.order_by(Club.id).limit(limit + 1)
+
     result = await db.execute(query)
-    clubs = result.scalars().all()
-    
-    return [{
-        "id": club.id,
-        "name": club.name,
-        "description": club.description,
-        "category": club.category,
-        "max_members": club.max_members,
-        "member_count": len(club.members),
-        "leader": {
-            "id": club.leader.id,
-            "email": club.leader.email,
-            "name": f"{club.leader.first_name} {club.leader.last_name}"
-        } if club.leader else None
-    } for club in clubs]
+    rows = result.all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = str(rows[-1].id)
+
+    clubs = []
+    for row in rows:
+        club = {
+            "id": row.id,
+            "name": row.name,
+            "description": row.description,
+            "category": row.category,
+            "max_members": row.max_members,
+            "member_count": row.active_member_count,
+            "pending_member_count": row.pending_member_count
+        }
+        if "leader" in selected:
+            club["leader"] = {
+                "id": row.leader_id,
+                "email": row.leader_email,
+                "name": f"{row.leader_first_name} {row.leader_last_name}"
+            } if row.leader_id else None
+        clubs.append({field: club[field] for field in selected})
+    return clubs
+
+def club_validation_query(club_id: int, email: str, role_name: str):
+    """Select the club with the user, role and membership to validate, in one query."""
+    user_id = select(User.id).where(User.email == email).scalar_subquery()
+    role_id = (
+        select(ClubRole.id)
+        .where(ClubRole.club_id == Club.id)
+        .where(ClubRole.name == role_name)
+        .scalar_subquery()
+    )
+    is_member = exists(
+        select(ClubMember.id)
+        .where(ClubMember.club_id == Club.id)
+        .where(ClubMember.user_id == user_id)
+    )
+    return select(
+        Club.is_active,
+        user_id.label("user_id"),
+        role_id.label("role_id"),
+        is_member.label("is_member")
+    ).where(Club.id == club_id)
 
 @router.post("/{club_id}/members")
 async def add_club_member(
     club_id: int,
     member: ClubMemberAdd,
+    response: Response,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(check_permission(["admin", "teacher"]))
+    current_user: User = Depends(require_club_permission(ClubPermission.MANAGE_MEMBERS))
 ):
     """Add a member to a club."""
-    # Check if club exists and is active
-    club = await db.get(Club, club_id)
-    if not club or not club.is_active:
-        raise HTTPException(status_code=404, detail="Club not found")
-
-    # Check member limit
-    if club.max_members and len(club.members) >= club.max_members:
-        raise HTTPException(status_code=400, detail="Club is at maximum capacity")
-
-    # Get or create user
+    # Validate club, user, role and existing membership together
     result = await db.execute(
-        select(User).where(User.email == member.email)
+        club_validation_query(club_id, member.email, member.role_name)
     )
-    user = result.scalar_one_or_none()
-    if not user:
+    row = result.first()
+    if not row or not row.is_active:
+        raise HTTPException(status_code=404, detail="Club not found")
+    if row.user_id is None:
         raise HTTPException(status_code=404, detail="User not found")
+    if row.is_member:
+        raise HTTPException(
+            status_code=400,
+            detail="User is already a member of this club"
+        )
+    if row.role_id is None:
+        raise HTTPException(status_code=404, detail="Role not found")
 
-    # Check if already a member
+    # Add member; the unique constraint catches a concurrent duplicate
     result = await db.execute(
-        select(ClubMember)
-        .where(ClubMember.club_id == club_id)
-        .where(ClubMember.user_id == user.id)
+        upsert_insert(db, ClubMember.__table__)
+        .values(
+            user_id=row.user_id,
+            club_id=club_id,
+            role_id=row.role_id,
+            status="active",
+            joined_at=datetime.utcnow()
+        )
+        .on_conflict_do_nothing(index_elements=["club_id", "user_id"])
+        .returning(ClubMember.id)
     )
-    if result.scalar_one_or_none():
+    if result.scalar_one_or_none() is None:
         raise HTTPException(
             status_code=400,
             detail="User is already a member of this club"
         )
 
-    # Get role
+    # Take a member slot atomically (rolled back with the insert if full)
+    if not await claim_member_slot(db, club_id, row.role_id):
+        raise HTTPException(status_code=400, detail="Club is at maximum capacity")
+
+    await db.commit()
+    catalog_cache.invalidate()
+    invalidate_club_permissions(club_id)
+    remember_write(response)
+
+    return {"message": "Member added successfully"}
+
+@router.post("/{club_id}/members/bulk")
+async def add_club_members_bulk(
+    club_id: int,
+    roster: ClubRoster,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_club_permission(ClubPermission.MANAGE_MEMBERS))
+):
+    """Add a roster of members to a club in one call."""
+    # Lock the club row so concurrent imports share its capacity correctly
+    result = await db.execute(
+        select(
+            Club.is_active,
+            Club.max_members,
+            Club.active_member_count
+        )
+        .where(Club.id == club_id)
+        .with_for_update()
+    )
+    club = result.first()
+    if not club or not club.is_active:
+        raise HTTPException(status_code=404, detail="Club not found")
+
+    emails = {item.email for item in roster.members}
+    role_names = {item.role_name for item in roster.members}
+    result = await db.execute(select(User.email, User.id).where(User.email.in_(emails)))
+    user_ids = dict(result.all())
     result = await db.execute(
-        select(ClubRole)
+        select(ClubRole.name, ClubRole.id)
         .where(ClubRole.club_id == club_id)
-        .where(ClubRole.name == member.role_name)
+        .where(ClubRole.name.in_(role_names))
     )
-    role = result.scalar_one_or_none()
-    if not role:
-        raise HTTPException(status_code=404, detail="Role not found")
+    role_ids = dict(result.all())
+    result = await db.execute(
+        select(ClubMember.user_id)
+        .where(ClubMember.club_id == club_id)
+        .where(ClubMember.user_id.in_(user_ids.values()))
+    )
+    existing = set(result.scalars())
 
-    # Add member
-    member = ClubMember(
-        user_id=user.id,
-        club_id=club_id,
-        role_id=role.id,
-        status="active"
+    seats = (
+        club.max_members - club.active_member_count
+        if club.max_members is not None else len(roster.members)
     )
-    db.add(member)
+    results = []
+    new_rows = []
+    now = datetime.utcnow()
+    for item in roster.members:
+        user_id = user_ids.get(item.email)
+        role_id = role_ids.get(item.role_name)
+        if user_id is None:
+            detail = "User not found"
+        elif role_id is None:
+            detail = "Role not found"
+        elif user_id in existing:
+            detail = "User is already a member of this club"
+        elif seats <= 0:
+            detail = "Club is at maximum capacity"
+        else:
+            detail = None
+            seats -= 1
+            existing.add(user_id)
+            new_rows.append({
+                "user_id": user_id,
+                "club_id": club_id,
+                "role_id": role_id,
+                "status": "active",
+                "joined_at": now
+            })
+        results.append({
+            "email": item.email,
+            "status": "error" if detail else "added",
+            "detail": detail
+        })
+
+    if new_rows:
+        # Count only rows actually inserted, in case a concurrent add won the race
+        result = await db.execute(
+            upsert_insert(db, ClubMember.__table__)
+            .values(new_rows)
+            .on_conflict_do_nothing(index_elements=["club_id", "user_id"])
+            .returning(ClubMember.role_id)
+        )
+        inserted = Counter(result.scalars())
+        await db.execute(
+            update(Club)
+            .where(Club.id == club_id)
+            .values(active_member_count=Club.active_member_count + sum(inserted.values()))
+        )
+        for role_id, count in inserted.items():
+            await db.execute(
+                update(ClubRole)
+                .where(ClubRole.id == role_id)
+                .values(member_count=ClubRole.member_count + count)
+            )
     await db.commit()
+    catalog_cache.invalidate()
+    invalidate_club_permissions(club_id)
+    remember_write(response)
 
-    return {"message": "Member added successfully"}
+    return summarize_bulk_results(results)
 
 @router.post("/{club_id}/budget")
 async def add_budget_entry(
     club_id: int,
     entry: BudgetEntry,
+    response: Response,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(check_permission(["admin", "teacher"]))
+    current_user: User = Depends(require_club_permission(ClubPermission.MANAGE_BUDGET))
 ):
     """Add a budget entry for a club."""
     # Check if club exists and is active
@@ -202,13 +399,54 @@ async def add_budget_entry(
     # Create budget entry
     budget_entry = ClubBudget(
         club_id=club_id,
-        amount=entry.amount,
+        amount_cents=to_cents(entry.amount),
         description=entry.description,
         type=entry.type,
         category=entry.category,
         created_by_id=current_user.id
     )
-    db.add(budget_entry)
+    await record_budget_entry(db, budget_entry)
     await db.commit()
+    remember_write(response)
+
+    return {"message": "Budget entry added successfully"}
+
+async def get_budget_club(club_id: int, db: AsyncSession) -> Club:
+    club = await db.get(Club, club_id)
+    if not club or not club.is_active:
+        raise HTTPException(status_code=404, detail="Club not found")
+    return club
 
-    return {"message": "Budget entry added successfully"}
\ No newline at end of file
+@router.get("/{club_id}/budget/balance")
+async def get_budget_balance(
+    club_id: int,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(require_club_permission(ClubPermission.MANAGE_BUDGET))
+):
+    """Get a club's total income, expense and balance."""
+    await get_budget_club(club_id, db)
+    return await club_balance(db, club_id)
+
+@router.get("/{club_id}/budget/categories")
+async def get_budget_categories(
+    club_id: int,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(require_club_permission(ClubPermission.MANAGE_BUDGET))
+):
+    """Get income and expense per category, optionally for a month range."""
+    await get_budget_club(club_id, db)
+    return await category_totals(db, club_id, since, until)
+
+@router.get("/{club_id}/budget/monthly")
+async def get_budget_monthly(
+    club_id: int,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(require_club_permission(ClubPermission.MANAGE_BUDGET))
+):
+    """Get income, expense and net per month, optionally for a month range."""
+    await get_budget_club(club_id, db)
+    return await monthly_rollup(db, club_id, since, until)
\ No newline at end of file
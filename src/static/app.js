@@ -4,69 +4,130 @@ document.addEventListener("DOMContentLoaded", () => {
   const signupForm = document.getElementById("signup-form");
   const messageDiv = document.getElementById("message");
 
+  // Rendered cards by activity name, and the catalog version they reflect
+  const cards = new Map();
+  let catalogVersion = null;
+
+  function renderCard(card, details) {
+    const spotsLeft = details.max_participants - details.participants.length;
+
+    // Create participants HTML with delete icons instead of bullet points
+    const participantsHTML =
+      details.participants.length > 0
+        ? `<div class="participants-section">
+          <h5>Participants:</h5>
+          <ul class="participants-list">
+            ${details.participants
+              .map(
+                (email) =>
+                  `<li><span class="participant-email">${email}</span><button class="delete-btn" data-activity="${details.name}" data-email="${email}">❌</button></li>`
+              )
+              .join("")}
+          </ul>
+        </div>`
+        : `<p><em>No participants yet</em></p>`;
+
+    card.innerHTML = `
+      <h4>${details.name}</h4>
+      <p>${details.description}</p>
+      <p><strong>Schedule:</strong> ${details.schedule}</p>
+      <p><strong>Availability:</strong> <span class="spots-left">${spotsLeft}</span> spots left</p>
+      <div class="participants-container">
+        ${participantsHTML}
+      </div>
+    `;
+  }
+
+  // Create or patch the cards of the given activities; unchanged ones are skipped
+  function applyActivities(activities) {
+    activities.forEach((details) => {
+      const entry = cards.get(details.name);
+      if (entry && entry.updatedAt === details.updated_at) {
+        return;
+      }
+      if (entry) {
+        renderCard(entry.card, details);
+        entry.updatedAt = details.updated_at;
+        return;
+      }
+
+      const card = document.createElement("div");
+      card.className = "activity-card";
+      card.dataset.activity = details.name;
+      renderCard(card, details);
+      activitiesList.appendChild(card);
+
+      // Add option to select dropdown
+      const option = document.createElement("option");
+      option.value = details.name;
+      option.textContent = details.name;
+      activitySelect.appendChild(option);
+
+      cards.set(details.name, { card, updatedAt: details.updated_at });
+    });
+  }
+
   // Function to fetch activities from API
   async function fetchActivities() {
     try {
-      const response = await fetch("/activities");
-      const activities = await response.json();
-
-      // Clear loading message
-      activitiesList.innerHTML = "";
-
-      // Populate activities list
-      Object.entries(activities).forEach(([name, details]) => {
-        const activityCard = document.createElement("div");
-        activityCard.className = "activity-card";
-
-        const spotsLeft =
-          details.max_participants - details.participants.length;
-
-        // Create participants HTML with delete icons instead of bullet points
-        const participantsHTML =
-          details.participants.length > 0
-            ? `<div class="participants-section">
-              <h5>Participants:</h5>
-              <ul class="participants-list">
-                ${details.participants
-                  .map(
-                    (email) =>
-                      `<li><span class="participant-email">${email}</span><button class="delete-btn" data-activity="${name}" data-email="${email}">❌</button></li>`
-                  )
-                  .join("")}
-              </ul>
-            </div>`
-            : `<p><em>No participants yet</em></p>`;
-
-        activityCard.innerHTML = `
-          <h4>${name}</h4>
-          <p>${details.description}</p>
-          <p><strong>Schedule:</strong> ${details.schedule}</p>
-          <p><strong>Availability:</strong> ${spotsLeft} spots left</p>
-          <div class="participants-container">
-            ${participantsHTML}
-          </div>
-        `;
-
-        activitiesList.appendChild(activityCard);
-
-        // Add option to select dropdown
-        const option = document.createElement("option");
-        option.value = name;
-        option.textContent = name;
-        activitySelect.appendChild(option);
-      });
+      // After the first load only changes since our version are requested
+      const url = catalogVersion
+        ? `/activities?since=${encodeURIComponent(catalogVersion)}`
+        : "/activities";
+      // Revalidate with the server so unchanged catalogs come back as 304s
+      const response = await fetch(url, { cache: "no-cache" });
+      const result = await response.json();
 
-      // Add event listeners to delete buttons
-      document.querySelectorAll(".delete-btn").forEach((button) => {
-        button.addEventListener("click", handleUnregister);
-      });
+      if (catalogVersion) {
+        applyActivities(result.activities);
+        catalogVersion = result.version || catalogVersion;
+      } else {
+        // Clear loading message
+        activitiesList.innerHTML = "";
+        applyActivities(result);
+        catalogVersion = response.headers.get("X-Catalog-Version");
+      }
     } catch (error) {
-      activitiesList.innerHTML =
-        "<p>Failed to load activities. Please try again later.</p>";
+      if (cards.size === 0) {
+        activitiesList.innerHTML =
+          "<p>Failed to load activities. Please try again later.</p>";
+      }
       console.error("Error fetching activities:", error);
     }
   }
 
+  // One listener handles the delete buttons of every card, current and future
+  activitiesList.addEventListener("click", (event) => {
+    if (event.target.classList.contains("delete-btn")) {
+      handleUnregister(event);
+    }
+  });
+
+  // Show live seat counts pushed by the server
+  function updateSpotsLeft(seats) {
+    Object.entries(seats).forEach(([name, spotsLeft]) => {
+      const card = activitiesList.querySelector(
+        `.activity-card[data-activity="${CSS.escape(name)}"]`
+      );
+      if (card) {
+        card.querySelector(".spots-left").textContent = spotsLeft;
+      }
+    });
+  }
+
+  function subscribeToSeats() {
+    if (!window.EventSource) {
+      return;
+    }
+    // EventSource reconnects by itself; each reconnect starts with a snapshot
+    const source = new EventSource("/activities/stream");
+    ["snapshot", "seats"].forEach((type) => {
+      source.addEventListener(type, (event) => {
+        updateSpotsLeft(JSON.parse(event.data));
+      });
+    });
+  }
+
   // Handle unregister functionality
   async function handleUnregister(event) {
     const button = event.target;
@@ -157,4 +218,5 @@ document.addEventListener("DOMContentLoaded", () => {
 
   // Initialize app
   fetchActivities();
+  subscribeToSeats();
 });
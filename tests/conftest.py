@@ -0,0 +1,71 @@
+"""Test configuration: point the application at a throwaway SQLite database.
+
+The environment is set before any src module is imported, because the
+engine and settings are created at import time. Every test starts with
+empty tables and empty in-process caches.
+"""
+import asyncio
+import os
+import tempfile
+from contextlib import asynccontextmanager
+
+_db_dir = tempfile.mkdtemp(prefix="school-activities-tests-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_db_dir}/test.db"
+os.environ.setdefault("DB_READ_URLS", "")
+
+import httpx
+import pytest
+
+from src.app import app
+from src.auth.permissions import permission_cache
+from src.auth.security import create_access_token, principal_cache, _cached_tokens_by_email
+from src.database.activities import catalog_cache
+from src.database.config import Base, engine
+
+async def _disposing(coro):
+    try:
+        return await coro
+    finally:
+        # The pool's connections are bound to the loop that opened them
+        await engine.dispose()
+
+def _run(coro):
+    return asyncio.run(_disposing(coro))
+
+@asynccontextmanager
+async def _api():
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            yield client
+
+def _auth_headers(email: str) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': email})}"}
+
+@pytest.fixture
+def run():
+    """Run a coroutine to completion on a fresh event loop."""
+    return _run
+
+@pytest.fixture
+def api():
+    """Open an HTTP client on the app, with its lifespan running: `async with api() as client`."""
+    return _api
+
+@pytest.fixture
+def auth_headers():
+    """Bearer headers for the user with the given email."""
+    return _auth_headers
+
+@pytest.fixture(autouse=True)
+def fresh_database():
+    async def reset():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+
+    _run(reset())
+    catalog_cache.invalidate()
+    permission_cache.invalidate()
+    principal_cache.clear()
+    _cached_tokens_by_email.clear()
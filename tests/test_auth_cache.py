@@ -0,0 +1,74 @@
+"""The validated token cache must forget a user as soon as their account changes."""
+from sqlalchemy import select, update
+
+from src.auth.security import invalidate_user, principal_cache
+from src.database.config import AsyncSessionLocal
+from src.database.models import User
+
+ADMIN = "admin@mergington.edu"
+ADMIN_ONLY = "/admin/reports/balances"
+
+async def _seed():
+    async with AsyncSessionLocal() as db:
+        db.add(User(email=ADMIN, role="admin", hashed_password="x"))
+        await db.commit()
+
+async def _change_admin(**values):
+    """Change the admin account through the ORM, as the application does."""
+    async with AsyncSessionLocal() as db:
+        user = await db.scalar(select(User).where(User.email == ADMIN))
+        for attr, value in values.items():
+            setattr(user, attr, value)
+        await db.commit()
+
+def test_role_change_drops_cached_tokens(run, api, auth_headers):
+    async def scenario():
+        await _seed()
+        headers = auth_headers(ADMIN)
+        async with api() as client:
+            before = await client.get(ADMIN_ONLY, headers=headers)
+            cached = len(principal_cache)
+            await _change_admin(role="student")
+            after = await client.get(ADMIN_ONLY, headers=headers)
+        return before, cached, after
+
+    before, cached, after = run(scenario())
+
+    assert before.status_code == 200
+    assert cached == 1
+    assert after.status_code == 403
+
+def test_deactivation_drops_cached_tokens(run, api, auth_headers):
+    async def scenario():
+        await _seed()
+        headers = auth_headers(ADMIN)
+        async with api() as client:
+            before = await client.get(ADMIN_ONLY, headers=headers)
+            await _change_admin(is_active=False)
+            after = await client.get(ADMIN_ONLY, headers=headers)
+        return before, after
+
+    before, after = run(scenario())
+
+    assert before.status_code == 200
+    assert after.status_code == 401
+
+def test_core_writes_need_an_explicit_invalidation(run, api, auth_headers):
+    async def scenario():
+        await _seed()
+        headers = auth_headers(ADMIN)
+        async with api() as client:
+            await client.get(ADMIN_ONLY, headers=headers)
+            async with AsyncSessionLocal() as db:
+                await db.execute(update(User).where(User.email == ADMIN).values(is_active=False))
+                await db.commit()
+            # Core updates bypass the mapper event, so the token is still cached
+            cached = await client.get(ADMIN_ONLY, headers=headers)
+            invalidate_user(ADMIN)
+            invalidated = await client.get(ADMIN_ONLY, headers=headers)
+        return cached, invalidated
+
+    cached, invalidated = run(scenario())
+
+    assert cached.status_code == 200
+    assert invalidated.status_code == 401
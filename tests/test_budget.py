@@ -0,0 +1,53 @@
+"""Budget entries carry their sign in `type`, never in the amount."""
+import pytest
+
+from src.database.config import AsyncSessionLocal
+from src.database.models import User
+
+TEACHER = "teacher@mergington.edu"
+
+async def _create_club(client, headers) -> int:
+    async with AsyncSessionLocal() as db:
+        db.add(User(email=TEACHER, role="teacher", hashed_password="x"))
+        await db.commit()
+    response = await client.post(
+        "/clubs/",
+        json={"name": "Robotics", "description": "Robots", "category": "STEM"},
+        headers=headers
+    )
+    return response.json()["id"]
+
+def _entry(amount: str, type: str = "expense") -> dict:
+    return {"amount": amount, "description": "Parts", "type": type, "category": "supplies"}
+
+@pytest.mark.parametrize("amount", ["-5.00", "0", "0.00"])
+def test_non_positive_amounts_are_rejected(run, api, auth_headers, amount):
+    async def scenario():
+        headers = auth_headers(TEACHER)
+        async with api() as client:
+            club_id = await _create_club(client, headers)
+            response = await client.post(f"/clubs/{club_id}/budget", json=_entry(amount), headers=headers)
+            balance = await client.get(f"/clubs/{club_id}/budget/balance", headers=headers)
+        return response, balance.json()
+
+    response, balance = run(scenario())
+
+    assert response.status_code == 422
+    assert balance["expense"] == "0.00"
+
+def test_expenses_lower_the_balance(run, api, auth_headers):
+    async def scenario():
+        headers = auth_headers(TEACHER)
+        async with api() as client:
+            club_id = await _create_club(client, headers)
+            for entry in (_entry("20.00", "income"), _entry("10.50"), _entry("3.00")):
+                response = await client.post(f"/clubs/{club_id}/budget", json=entry, headers=headers)
+                assert response.status_code == 200
+            balance = await client.get(f"/clubs/{club_id}/budget/balance", headers=headers)
+        return balance.json()
+
+    balance = run(scenario())
+
+    assert balance["income"] == "20.00"
+    assert balance["expense"] == "13.50"
+    assert balance["balance"] == "6.50"
@@ -0,0 +1,130 @@
+"""Bulk signup and unregister: per-item results, partial failures and waitlist promotion."""
+from sqlalchemy import insert, select
+
+from src.database.config import AsyncSessionLocal
+from src.database.models import Activity, User, WaitlistEntry, activity_participants
+
+TEACHER = "teacher@mergington.edu"
+SIGNUP = "/activities/bulk/signup"
+UNREGISTER = "/activities/bulk/unregister"
+
+def _student(student: int) -> str:
+    return f"student{student}@mergington.edu"
+
+async def _seed(capacity: int = 2, enrolled: int = 0, waiting: int = 0):
+    """One activity and five students (ids 1-5); the teacher is user 6.
+
+    The first `enrolled` students are signed up and the next `waiting`
+    students are queued, in order.
+    """
+    async with AsyncSessionLocal() as db:
+        db.add(Activity(
+            name="Chess Club",
+            description="Strategy games",
+            schedule="Fridays, 3:30 PM - 5:00 PM",
+            max_participants=capacity,
+            participant_count=enrolled
+        ))
+        db.add_all(
+            User(email=_student(i), role="student", hashed_password="x") for i in range(1, 6)
+        )
+        db.add(User(email=TEACHER, role="teacher", hashed_password="x"))
+        await db.flush()
+        if enrolled:
+            await db.execute(insert(activity_participants), [
+                {"activity_id": 1, "user_id": user_id} for user_id in range(1, enrolled + 1)
+            ])
+        db.add_all(
+            WaitlistEntry(activity_id=1, user_id=user_id)
+            for user_id in range(enrolled + 1, enrolled + waiting + 1)
+        )
+        await db.commit()
+
+async def _state():
+    async with AsyncSessionLocal() as db:
+        participants = set(await db.scalars(select(activity_participants.c.user_id)))
+        queued = list(await db.scalars(select(WaitlistEntry.user_id).order_by(WaitlistEntry.id)))
+        count = await db.scalar(select(Activity.participant_count))
+    return participants, queued, count
+
+def _items(*pairs):
+    return {"items": [{"activity": activity, "email": email} for activity, email in pairs]}
+
+def test_bulk_signup_reports_each_item(run, api, auth_headers):
+    async def scenario():
+        await _seed(capacity=3, enrolled=1)
+        async with api() as client:
+            response = await client.post(SIGNUP, json=_items(
+                ("Chess Club", _student(2)),
+                ("Chess Club", _student(1)),
+                ("Drama Club", _student(3)),
+                ("Chess Club", "nobody@mergington.edu"),
+                ("Chess Club", _student(2)),
+                ("Chess Club", _student(3)),
+                ("Chess Club", _student(4))
+            ), headers=auth_headers(TEACHER))
+        return response, await _state()
+
+    response, (participants, _, count) = run(scenario())
+    body = response.json()
+
+    assert response.status_code == 200
+    assert [(item["status"], item["detail"]) for item in body["results"]] == [
+        ("enrolled", None),
+        ("error", "Already signed up"),
+        ("error", "Activity not found"),
+        ("error", "User not found"),
+        ("error", "Already signed up"),
+        ("enrolled", None),
+        ("error", "Activity is full")
+    ]
+    assert (body["succeeded"], body["failed"]) == (2, 5)
+    assert participants == {1, 2, 3}
+    assert count == 3
+
+def test_bulk_unregister_reports_each_item_and_promotes(run, api, auth_headers):
+    async def scenario():
+        await _seed(capacity=2, enrolled=2, waiting=2)
+        async with api() as client:
+            response = await client.post(UNREGISTER, json=_items(
+                ("Chess Club", _student(1)),
+                ("Chess Club", _student(1)),
+                ("Chess Club", _student(5)),
+                ("Drama Club", _student(2)),
+                ("Chess Club", _student(2))
+            ), headers=auth_headers(TEACHER))
+        return response, await _state()
+
+    response, (participants, queued, count) = run(scenario())
+    body = response.json()
+
+    assert response.status_code == 200
+    assert [(item["status"], item["detail"]) for item in body["results"]] == [
+        ("unregistered", None),
+        ("error", "Not signed up for this activity"),
+        ("error", "Not signed up for this activity"),
+        ("error", "Activity not found"),
+        ("unregistered", None)
+    ]
+    assert (body["succeeded"], body["failed"]) == (2, 3)
+    # Both freed seats go to the queue, in order
+    assert participants == {3, 4}
+    assert queued == []
+    assert count == 2
+
+def test_bulk_endpoints_are_staff_only(run, api, auth_headers):
+    async def scenario():
+        await _seed()
+        async with api() as client:
+            signup = await client.post(
+                SIGNUP, json=_items(("Chess Club", _student(1))), headers=auth_headers(_student(1))
+            )
+            unregister = await client.post(
+                UNREGISTER, json=_items(("Chess Club", _student(1))), headers=auth_headers(_student(1))
+            )
+        return signup, unregister, await _state()
+
+    signup, unregister, (participants, _, _) = run(scenario())
+
+    assert signup.status_code == unregister.status_code == 403
+    assert participants == set()
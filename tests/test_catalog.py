@@ -0,0 +1,117 @@
+"""GET /activities versions, delta fetches and conditional requests."""
+from datetime import datetime
+
+from src.database.config import AsyncSessionLocal
+from src.database.models import Activity, User
+
+STUDENT = "student@mergington.edu"
+
+async def _seed():
+    """Three activities last changed ten minutes apart, well in the past."""
+    async with AsyncSessionLocal() as db:
+        db.add_all(
+            Activity(
+                name=name,
+                description="d",
+                schedule="TBD",
+                max_participants=10,
+                updated_at=datetime(2026, 1, 1, 10, minute)
+            )
+            for name, minute in (("Chess Club", 0), ("Drama Club", 10), ("Gym Class", 20))
+        )
+        db.add(User(email=STUDENT, role="student", hashed_password="x"))
+        await db.commit()
+
+def _names(response) -> list:
+    return [row["name"] for row in response.json()["activities"]]
+
+def test_version_header_and_delta(run, api):
+    async def scenario():
+        await _seed()
+        async with api() as client:
+            full = await client.get("/activities")
+            delta = await client.get("/activities", params={"since": "2026-01-01T10:05:00"})
+            current = await client.get(
+                "/activities", params={"since": full.headers["X-Catalog-Version"]}
+            )
+            ahead = await client.get("/activities", params={"since": "2026-01-01T11:00:00"})
+        return full, delta, current, ahead
+
+    full, delta, current, ahead = run(scenario())
+
+    assert full.headers["X-Catalog-Version"] == "2026-01-01T10:20:00.000000"
+    assert len(full.json()) == 3
+    assert delta.json()["version"] == full.headers["X-Catalog-Version"]
+    assert _names(delta) == ["Drama Club", "Gym Class"]
+    # The overlap window re-sends the newest row
+    assert _names(current) == ["Gym Class"]
+    assert _names(ahead) == []
+
+def test_timezone_aware_since_is_compared_in_utc(run, api):
+    async def scenario():
+        await _seed()
+        async with api() as client:
+            return await client.get(
+                "/activities", params={"since": "2026-01-01T12:15:00+02:00"}
+            )
+
+    assert _names(run(scenario())) == ["Gym Class"]
+
+def test_signup_advances_the_version(run, api, auth_headers):
+    async def scenario():
+        await _seed()
+        async with api() as client:
+            before = await client.get("/activities")
+            await client.post("/activities/Chess Club/signup", headers=auth_headers(STUDENT))
+            delta = await client.get(
+                "/activities", params={"since": before.headers["X-Catalog-Version"]}
+            )
+        return before, delta
+
+    before, delta = run(scenario())
+
+    assert delta.headers["X-Catalog-Version"] > before.headers["X-Catalog-Version"]
+    assert delta.json()["version"] == delta.headers["X-Catalog-Version"]
+    assert _names(delta) == ["Chess Club", "Gym Class"]
+    assert delta.json()["activities"][0]["participants"] == [STUDENT]
+
+def test_unchanged_catalog_is_not_modified(run, api):
+    async def scenario():
+        await _seed()
+        async with api() as client:
+            full = await client.get("/activities")
+            cached = await client.get(
+                "/activities", headers={"If-None-Match": full.headers["ETag"]}
+            )
+        return full, cached
+
+    full, cached = run(scenario())
+
+    assert cached.status_code == 304
+    assert cached.headers["X-Catalog-Version"] == full.headers["X-Catalog-Version"]
+
+def test_encodings_share_a_weak_etag_and_vary(run, api):
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            # Large enough for GZipMiddleware to compress
+            db.add_all(
+                Activity(name=f"Activity {i}", description="d" * 100, schedule="TBD", max_participants=10)
+                for i in range(20)
+            )
+            await db.commit()
+        async with api() as client:
+            gzip = await client.get("/activities", headers={"Accept-Encoding": "gzip"})
+            identity = await client.get("/activities", headers={"Accept-Encoding": "identity"})
+            strong = gzip.headers["ETag"].removeprefix("W/")
+            cached = await client.get("/activities", headers={"If-None-Match": strong})
+        return gzip, identity, cached
+
+    gzip, identity, cached = run(scenario())
+
+    assert gzip.headers["Content-Encoding"] == "gzip"
+    assert "Content-Encoding" not in identity.headers
+    assert gzip.headers["ETag"] == identity.headers["ETag"]
+    assert gzip.headers["ETag"].startswith('W/"')
+    assert cached.status_code == 304
+    for response in (gzip, identity, cached):
+        assert response.headers["Vary"].split(", ").count("Accept-Encoding") == 1
@@ -0,0 +1,89 @@
+"""Club permission parsing and the generation-based permission cache."""
+import pytest
+from sqlalchemy import select
+
+from src.auth.permissions import (
+    ClubPermission,
+    ClubPermissionCache,
+    get_club_permissions,
+    parse_permissions
+)
+from src.database.config import AsyncSessionLocal
+from src.database.models import Club, ClubMember, ClubRole, User
+
+@pytest.mark.parametrize("text, permissions", [
+    ("all", ClubPermission.ALL),
+    ("view,participate", ClubPermission.VIEW | ClubPermission.PARTICIPATE),
+    (" View , MANAGE_BUDGET ", ClubPermission.VIEW | ClubPermission.MANAGE_BUDGET),
+    ('["view", "manage_members"]', ClubPermission.VIEW | ClubPermission.MANAGE_MEMBERS),
+    ("view,fly,none", ClubPermission.VIEW),
+    ("[not json", ClubPermission.NONE),
+    ("", ClubPermission.NONE),
+    (None, ClubPermission.NONE),
+])
+def test_parse_permissions(text, permissions):
+    assert parse_permissions(text) == permissions
+
+def test_club_invalidation_only_drops_that_club():
+    cache = ClubPermissionCache(maxsize=10, ttl=60)
+    cache.set(1, 1, ClubPermission.VIEW, cache.generation(1))
+    cache.set(1, 2, ClubPermission.ALL, cache.generation(2))
+
+    cache.invalidate(1)
+
+    assert cache.get(1, 1) is None
+    assert cache.get(1, 2) == ClubPermission.ALL
+
+def test_global_invalidation_drops_every_club():
+    cache = ClubPermissionCache(maxsize=10, ttl=60)
+    cache.set(1, 1, ClubPermission.VIEW, cache.generation(1))
+    cache.set(1, 2, ClubPermission.ALL, cache.generation(2))
+
+    cache.invalidate()
+
+    assert cache.get(1, 1) is None
+    assert cache.get(1, 2) is None
+
+def test_result_read_before_an_invalidation_is_not_served():
+    cache = ClubPermissionCache(maxsize=10, ttl=60)
+    # A lookup takes the generation, then a change commits before it stores
+    generation = cache.generation(1)
+    cache.invalidate(1)
+    cache.set(1, 1, ClubPermission.ALL, generation)
+
+    assert cache.get(1, 1) is None
+
+    generation = cache.generation(1)
+    cache.invalidate()
+    cache.set(1, 1, ClubPermission.ALL, generation)
+
+    assert cache.get(1, 1) is None
+
+def test_membership_changes_reach_cached_permissions(run):
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            db.add(User(email="leader@mergington.edu", role="student", hashed_password="x"))
+            db.add(Club(name="Chess Club", description="d", category="games"))
+            await db.flush()
+            member_role = ClubRole(name="Member", description="d", permissions="view,participate", club_id=1)
+            leader_role = ClubRole(name="Leader", description="d", permissions="all", club_id=1)
+            db.add_all([member_role, leader_role])
+            await db.flush()
+            db.add(ClubMember(user_id=1, club_id=1, role_id=member_role.id, status="active"))
+            await db.commit()
+
+            before = await get_club_permissions(db, 1, 1)
+            membership = await db.scalar(select(ClubMember))
+            membership.role_id = leader_role.id
+            await db.commit()
+            promoted = await get_club_permissions(db, 1, 1)
+            membership.status = "inactive"
+            await db.commit()
+            inactive = await get_club_permissions(db, 1, 1)
+        return before, promoted, inactive
+
+    before, promoted, inactive = run(scenario())
+
+    assert before == ClubPermission.VIEW | ClubPermission.PARTICIPATE
+    assert promoted == ClubPermission.ALL
+    assert inactive == ClubPermission.NONE
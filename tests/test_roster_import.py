@@ -0,0 +1,42 @@
+"""Roster import error reporting and the password hashing pool."""
+from sqlalchemy import select
+
+from src.database.config import AsyncSessionLocal
+from src.database.models import User
+from src.database.roster_import import (
+    HASH_START_METHOD,
+    get_hash_pool,
+    import_roster,
+    shutdown_hash_pool
+)
+
+NDJSON = [
+    '{"email": "ada@mergington.edu", "password": "secret"}\n',
+    '{"email": "broken@mergington.edu", "password": \n',
+    '["grace@mergington.edu", "secret"]\n',
+    '\n',
+    '{"email": "not-an-email", "password": "secret"}\n',
+    '{"email": "alan@mergington.edu", "password": "secret", "role": "teacher"}\n'
+]
+
+def test_ndjson_import_reports_malformed_lines(run):
+    async def scenario():
+        try:
+            report = await import_roster("users", NDJSON, "ndjson")
+            start_method = get_hash_pool()._mp_context.get_start_method()
+        finally:
+            await shutdown_hash_pool()
+        async with AsyncSessionLocal() as db:
+            users = dict((await db.execute(select(User.email, User.role))).all())
+        return report.as_dict(), start_method, users
+
+    summary, start_method, users = run(scenario())
+
+    assert [(error["line"], error["error"].split(":")[0]) for error in summary["errors"]] == [
+        (2, "Invalid JSON"),
+        (3, "Expected a JSON object"),
+        (5, "Invalid email")
+    ]
+    assert (summary["rows"], summary["inserted"], summary["failed"]) == (5, 2, 3)
+    assert users == {"ada@mergington.edu": "student", "alan@mergington.edu": "teacher"}
+    assert start_method == HASH_START_METHOD
@@ -0,0 +1,114 @@
+"""Schedule parsing, time slot maintenance and signup conflict checks."""
+import pytest
+from sqlalchemy import delete, insert, select
+
+from src.database.config import AsyncSessionLocal
+from src.database.models import Activity, ActivityTimeSlot, User, activity_participants
+from src.database.schedule import TimeSlot, parse_schedule, rebuild_time_slots
+
+STUDENT = "student@mergington.edu"
+
+@pytest.mark.parametrize("schedule, slots", [
+    ("Fridays, 3:30 PM - 5:00 PM", [TimeSlot(4, 930, 1020)]),
+    (
+        "Tuesdays and Thursdays, 3:30 PM - 4:30 PM",
+        [TimeSlot(1, 930, 990), TimeSlot(3, 930, 990)]
+    ),
+    (
+        "Mondays, Wednesdays, Fridays, 2:00 PM - 3:00 PM",
+        [TimeSlot(0, 840, 900), TimeSlot(2, 840, 900), TimeSlot(4, 840, 900)]
+    ),
+    (
+        "Mon & Wed, 9 AM - 10:15 AM; Saturday, 12 PM - 1 PM",
+        [TimeSlot(0, 540, 615), TimeSlot(2, 540, 615), TimeSlot(5, 720, 780)]
+    ),
+    ("Sundays, 12:00 AM - 1:00 AM", [TimeSlot(6, 0, 60)]),
+])
+def test_parse_schedule(schedule, slots):
+    assert parse_schedule(schedule) == slots
+
+@pytest.mark.parametrize("schedule", [
+    "TBD",
+    "Fridays, 5:00 PM - 3:00 PM",
+    "Funday, 3:00 PM - 4:00 PM",
+    "Mondays, 13:00 PM - 14:00 PM",
+])
+def test_parse_schedule_rejects_invalid_text(schedule):
+    with pytest.raises(ValueError):
+        parse_schedule(schedule)
+
+async def _slots(activity_id: int):
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(ActivityTimeSlot.weekday, ActivityTimeSlot.start_minute, ActivityTimeSlot.end_minute)
+            .where(ActivityTimeSlot.activity_id == activity_id)
+            .order_by(ActivityTimeSlot.weekday)
+        )
+        return [TimeSlot(*row) for row in result]
+
+def _activity(name: str, schedule: str) -> Activity:
+    return Activity(name=name, description="d", schedule=schedule, max_participants=10)
+
+def test_slots_follow_schedule_writes(run):
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            activity = _activity("Chess Club", "Fridays, 3:30 PM - 5:00 PM")
+            db.add(activity)
+            await db.commit()
+            created = await _slots(activity.id)
+
+            activity.schedule = "Mondays and Tuesdays, 4:00 PM - 5:00 PM"
+            await db.commit()
+            changed = await _slots(activity.id)
+
+            activity.schedule = "To be announced"
+            await db.commit()
+            unparseable = await _slots(activity.id)
+        return created, changed, unparseable
+
+    created, changed, unparseable = run(scenario())
+
+    assert created == [TimeSlot(4, 930, 1020)]
+    assert changed == [TimeSlot(0, 960, 1020), TimeSlot(1, 960, 1020)]
+    assert unparseable == []
+
+def test_rebuild_restores_missing_slots(run):
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            db.add_all([
+                _activity("Chess Club", "Fridays, 3:30 PM - 5:00 PM"),
+                _activity("Drama Club", "TBD")
+            ])
+            await db.commit()
+            await db.execute(delete(ActivityTimeSlot))
+            count = await rebuild_time_slots(db)
+            await db.commit()
+        return count, await _slots(1)
+
+    count, slots = run(scenario())
+
+    assert count == 1
+    assert slots == [TimeSlot(4, 930, 1020)]
+
+def test_signup_rejects_overlap_with_a_new_activity(run, api, auth_headers):
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            db.add_all([
+                _activity("Chess Club", "Fridays, 3:30 PM - 5:00 PM"),
+                _activity("Art Club", "Fridays, 4:00 PM - 6:00 PM"),
+                _activity("Gym Class", "Fridays, 5:00 PM - 6:00 PM"),
+                User(email=STUDENT, role="student", hashed_password="x")
+            ])
+            await db.flush()
+            await db.execute(insert(activity_participants).values(activity_id=1, user_id=1))
+            await db.commit()
+        async with api() as client:
+            overlapping = await client.post("/activities/Art Club/signup", headers=auth_headers(STUDENT))
+            adjacent = await client.post("/activities/Gym Class/signup", headers=auth_headers(STUDENT))
+        return overlapping, adjacent
+
+    overlapping, adjacent = run(scenario())
+
+    assert overlapping.status_code == 409
+    assert "Chess Club" in overlapping.json()["detail"]
+    assert adjacent.status_code == 200
@@ -0,0 +1,45 @@
+"""Live seat stream subscriptions are released however the connection ends."""
+import pytest
+
+from src.app import stream_seat_availability
+from src.events import seat_events
+
+SCOPE = {
+    "type": "http",
+    "asgi": {"version": "3.0", "spec_version": "2.4"},
+    "http_version": "1.1",
+    "method": "GET",
+    "path": "/activities/stream",
+    "headers": []
+}
+
+def test_abort_before_streaming_leaves_no_subscriber(run):
+    async def scenario():
+        async def receive():
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            raise OSError("client went away")
+
+        for _ in range(3):
+            response = await stream_seat_availability()
+            with pytest.raises(Exception):
+                await response(SCOPE, receive, send)
+        return seat_events.stats()["subscribers"]
+
+    assert run(scenario()) == 0
+
+def test_closed_stream_releases_its_subscription(run):
+    async def scenario():
+        response = await stream_seat_availability()
+        chunks = response.body_iterator
+        first = await chunks.__anext__()
+        subscribed = seat_events.stats()["subscribers"]
+        await chunks.aclose()
+        return first, subscribed, seat_events.stats()["subscribers"]
+
+    first, subscribed, remaining = run(scenario())
+
+    assert first.startswith("event: snapshot")
+    assert subscribed == 1
+    assert remaining == 0
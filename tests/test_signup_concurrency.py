@@ -0,0 +1,85 @@
+"""Concurrent signups must never put more students in an activity than it has seats."""
+import asyncio
+
+from sqlalchemy import func, insert, select
+
+from src.database.config import AsyncSessionLocal
+from src.database.models import Activity, User, WaitlistEntry, activity_participants
+
+CAPACITY = 5
+STUDENTS = 40
+SIGNUP = "/activities/Chess Club/signup"
+UNREGISTER = "/activities/Chess Club/unregister"
+
+async def _seed(capacity: int, students: int, enrolled: int = 0):
+    """Create an activity and students; the first `enrolled` students are signed up."""
+    async with AsyncSessionLocal() as db:
+        db.add(Activity(
+            name="Chess Club",
+            description="Strategy games",
+            schedule="Fridays, 3:30 PM - 5:00 PM",
+            max_participants=capacity,
+            participant_count=enrolled
+        ))
+        db.add_all(
+            User(email=f"student{i}@mergington.edu", role="student", hashed_password="x")
+            for i in range(students)
+        )
+        await db.flush()
+        if enrolled:
+            await db.execute(insert(activity_participants), [
+                {"activity_id": 1, "user_id": user_id} for user_id in range(1, enrolled + 1)
+            ])
+        await db.commit()
+
+async def _enrollment():
+    """The maintained counter, participant rows and waitlist length."""
+    async with AsyncSessionLocal() as db:
+        counter = await db.scalar(select(Activity.participant_count))
+        rows = await db.scalar(select(func.count()).select_from(activity_participants))
+        waitlisted = await db.scalar(select(func.count()).select_from(WaitlistEntry))
+    return counter, rows, waitlisted
+
+def _student(student: int) -> str:
+    return f"student{student}@mergington.edu"
+
+def test_concurrent_signups_never_overbook(run, api, auth_headers):
+    async def scenario():
+        await _seed(CAPACITY, STUDENTS)
+        # Every student signs up twice at the same moment
+        async with api() as client:
+            responses = await asyncio.gather(*(
+                client.post(SIGNUP, headers=auth_headers(_student(student)))
+                for student in range(STUDENTS) for _ in range(2)
+            ))
+        return responses, await _enrollment()
+
+    responses, (counter, rows, waitlisted) = run(scenario())
+    statuses = [response.status_code for response in responses]
+
+    assert statuses.count(200) == CAPACITY
+    assert set(statuses) <= {200, 202, 400}
+    assert counter == rows == CAPACITY
+    assert waitlisted == STUDENTS - CAPACITY
+
+def test_concurrent_unregister_and_signup_keep_counter_exact(run, api, auth_headers):
+    async def scenario():
+        await _seed(CAPACITY, STUDENTS, enrolled=CAPACITY)
+        # Enrolled students leave while everyone else tries to take their seats
+        async with api() as client:
+            responses = await asyncio.gather(
+                *(
+                    client.delete(UNREGISTER, headers=auth_headers(_student(student)))
+                    for student in range(CAPACITY)
+                ),
+                *(
+                    client.post(SIGNUP, headers=auth_headers(_student(student)))
+                    for student in range(CAPACITY, STUDENTS)
+                )
+            )
+        return responses, await _enrollment()
+
+    responses, (counter, rows, _) = run(scenario())
+
+    assert all(response.status_code in (200, 202) for response in responses)
+    assert counter == rows <= CAPACITY
@@ -0,0 +1,129 @@
+"""Waitlist promotion and the rule that participants are never queued."""
+from sqlalchemy import insert, select
+
+from src.database.activities import join_waitlist
+from src.database.config import AsyncSessionLocal
+from src.database.models import Activity, User, WaitlistEntry, activity_participants
+
+ENROLLED = "enrolled@mergington.edu"
+LEAVING = "leaving@mergington.edu"
+WAITING = "waiting@mergington.edu"
+TEACHER = "teacher@mergington.edu"
+
+async def _seed(capacity: int = 2):
+    """A full activity whose queue starts with a user who is already enrolled.
+
+    Users 1 (ENROLLED) and 2 (LEAVING) hold the seats; the waitlist holds
+    ENROLLED first and WAITING second.
+    """
+    async with AsyncSessionLocal() as db:
+        db.add(Activity(
+            name="Chess Club",
+            description="Strategy games",
+            schedule="Fridays, 3:30 PM - 5:00 PM",
+            max_participants=capacity,
+            participant_count=2
+        ))
+        db.add_all([
+            User(email=ENROLLED, role="student", hashed_password="x"),
+            User(email=LEAVING, role="student", hashed_password="x"),
+            User(email=WAITING, role="student", hashed_password="x"),
+            User(email=TEACHER, role="teacher", hashed_password="x")
+        ])
+        await db.flush()
+        await db.execute(insert(activity_participants), [
+            {"activity_id": 1, "user_id": 1},
+            {"activity_id": 1, "user_id": 2}
+        ])
+        db.add_all([
+            WaitlistEntry(activity_id=1, user_id=1),
+            WaitlistEntry(activity_id=1, user_id=3)
+        ])
+        await db.commit()
+
+async def _state():
+    async with AsyncSessionLocal() as db:
+        participants = set(await db.scalars(select(activity_participants.c.user_id)))
+        queued = list(await db.scalars(select(WaitlistEntry.user_id).order_by(WaitlistEntry.id)))
+        count = await db.scalar(select(Activity.participant_count))
+    return participants, queued, count
+
+def test_unregister_promotes_past_an_enrolled_head(run, api, auth_headers):
+    async def scenario():
+        await _seed()
+        async with api() as client:
+            response = await client.delete(
+                "/activities/Chess Club/unregister", headers=auth_headers(LEAVING)
+            )
+        return response, await _state()
+
+    response, (participants, queued, count) = run(scenario())
+
+    assert response.status_code == 200
+    assert response.json()["seats_remaining"] == 0
+    assert participants == {1, 3}
+    assert queued == []
+    assert count == 2
+
+def test_bulk_unregister_promotes_past_an_enrolled_head(run, api, auth_headers):
+    async def scenario():
+        await _seed()
+        async with api() as client:
+            response = await client.post(
+                "/activities/bulk/unregister",
+                json={"items": [{"activity": "Chess Club", "email": LEAVING}]},
+                headers=auth_headers(TEACHER)
+            )
+        return response, await _state()
+
+    response, (participants, queued, count) = run(scenario())
+
+    assert response.status_code == 200
+    assert participants == {1, 3}
+    assert queued == []
+    assert count == 2
+
+def test_participants_cannot_join_the_waitlist(run):
+    async def scenario():
+        await _seed()
+        async with AsyncSessionLocal() as db:
+            position = await join_waitlist(db, 1, 2)
+            await db.commit()
+        return position, await _state()
+
+    position, (_, queued, _) = run(scenario())
+
+    assert position is None
+    assert queued == [1, 3]
+
+def test_signup_removes_the_users_waitlist_entry(run, api, auth_headers):
+    async def scenario():
+        await _seed(capacity=3)
+        async with api() as client:
+            response = await client.post(
+                "/activities/Chess Club/signup", headers=auth_headers(WAITING)
+            )
+        return response, await _state()
+
+    response, (participants, queued, _) = run(scenario())
+
+    assert response.status_code == 200
+    assert 3 in participants
+    assert 3 not in queued
+
+def test_bulk_signup_removes_the_users_waitlist_entry(run, api, auth_headers):
+    async def scenario():
+        await _seed(capacity=3)
+        async with api() as client:
+            response = await client.post(
+                "/activities/bulk/signup",
+                json={"items": [{"activity": "Chess Club", "email": WAITING}]},
+                headers=auth_headers(TEACHER)
+            )
+        return response, await _state()
+
+    response, (participants, queued, _) = run(scenario())
+
+    assert response.json()["succeeded"] == 1
+    assert 3 in participants
+    assert 3 not in queued